@@ -1,12 +1,66 @@
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pybind11/stl_bind.h>
 
+#include <algorithm>
+#include <cstdint>
+#include <memory>
+#include <stdexcept>
+
+#include "coord_utils.h"
 #include "entanglement.h"
 
 namespace py = pybind11;
 
+// Passed by reference between the bindings instead of being converted to and
+// from a Python list on every call.
+PYBIND11_MAKE_OPAQUE(std::vector<rna::ResidueCoord>);
+PYBIND11_MAKE_OPAQUE(std::vector<rna::Surface>);
+
 namespace {
 
+// Flat, NumPy-compatible copy of HitInfo for Result.hits_array.
+struct HitRecord {
+  int32_t loop_id;
+  int32_t segment_id;
+  int32_t res_a;
+  int32_t res_b;
+  int8_t atom_a;
+  int8_t atom_b;
+  double x;
+  double y;
+  double z;
+};
+
+py::array_t<HitRecord> HitsArray(const std::vector<rna::HitInfo> &hits) {
+  auto records = std::make_unique<std::vector<HitRecord>>();
+  records->reserve(hits.size());
+  for (const auto &hit : hits) {
+    records->push_back(HitRecord{hit.loop_id,
+                                 hit.segment_id,
+                                 hit.res_a,
+                                 hit.res_b,
+                                 static_cast<int8_t>(hit.atom_a),
+                                 static_cast<int8_t>(hit.atom_b),
+                                 hit.point.x,
+                                 hit.point.y,
+                                 hit.point.z});
+  }
+  const auto size = static_cast<py::ssize_t>(records->size());
+  HitRecord *data = records->data();
+  // The capsule takes ownership only once it exists; until then records
+  // frees the buffer if anything throws.
+  py::capsule owner(records.get(), [](void *ptr) {
+    delete static_cast<std::vector<HitRecord> *>(ptr);
+  });
+  records.release();
+  return py::array_t<HitRecord>(size, data, owner);
+}
+
+using ResidueCoordArray = std::vector<rna::ResidueCoord>;
+using SurfaceArray = std::vector<rna::Surface>;
+
 std::vector<rna::BasePair> ToBasePairs(
     const std::vector<std::pair<int, int>> &bp_list,
     rna::BasePair::Type bp_type) {
@@ -18,11 +72,65 @@ std::vector<rna::BasePair> ToBasePairs(
   return result;
 }
 
+// Read-only float64 view of a vector of all-double structs (Vec2, Triangle, ...)
+// with the leading dimension = items.size(). `owner` is kept alive as the
+// array base; the view is only valid until the vector is reassigned.
+template <typename T>
+py::array DoubleView(const std::vector<T> &items,
+                     std::vector<py::ssize_t> inner_shape,
+                     py::handle owner) {
+  static_assert(sizeof(T) % sizeof(double) == 0, "T must consist of doubles");
+  std::vector<py::ssize_t> shape{static_cast<py::ssize_t>(items.size())};
+  shape.insert(shape.end(), inner_shape.begin(), inner_shape.end());
+  if (items.empty()) {
+    return py::array_t<double>(shape);
+  }
+  py::array view(py::dtype::of<double>(),
+                 shape,
+                 reinterpret_cast<const double *>(items.data()),
+                 owner);
+  view.attr("setflags")(py::arg("write") = false);
+  return view;
+}
+
+ResidueCoordArray ResidueCoordsFromNumpy(
+    py::array_t<int, py::array::c_style | py::array::forcecast> indices,
+    py::array_t<double, py::array::c_style | py::array::forcecast> coords) {
+  if (indices.ndim() != 1) {
+    throw std::invalid_argument("indices must be a 1-D array");
+  }
+  if (coords.ndim() != 3 || coords.shape(2) != 3) {
+    throw std::invalid_argument("coords must have shape (n_res, n_atoms, 3)");
+  }
+  if (coords.shape(0) != indices.shape(0)) {
+    throw std::invalid_argument("indices and coords must have the same length");
+  }
+  const py::ssize_t n_res = coords.shape(0);
+  const py::ssize_t n_atoms = coords.shape(1);
+  const int *index_ptr = indices.data();
+  const double *xyz = coords.data();
+
+  ResidueCoordArray result(static_cast<size_t>(n_res));
+  for (py::ssize_t r = 0; r < n_res; ++r) {
+    auto &residue = result[static_cast<size_t>(r)];
+    residue.res_index = index_ptr[r];
+    residue.atoms.resize(static_cast<size_t>(n_atoms));
+    for (auto &atom : residue.atoms) {
+      atom = rna::Vec3{xyz[0], xyz[1], xyz[2]};
+      xyz += 3;
+    }
+  }
+  return result;
+}
+
 }  // namespace
 
 PYBIND11_MODULE(rnaknotdetector_core, m) {
   m.doc() = "Minimal bindings for RNAknotDetector core.";
 
+  PYBIND11_NUMPY_DTYPE(
+      HitRecord, loop_id, segment_id, res_a, res_b, atom_a, atom_b, x, y, z);
+
   py::class_<rna::Vec2>(m, "Vec2")
       .def(py::init<double, double>(), py::arg("x") = 0.0, py::arg("y") = 0.0)
       .def_readwrite("x", &rna::Vec2::x)
@@ -44,6 +152,18 @@ PYBIND11_MODULE(rnaknotdetector_core, m) {
       .def_readwrite("res_index", &rna::ResidueCoord::res_index)
       .def_readwrite("atoms", &rna::ResidueCoord::atoms);
 
+  // Lists still convert implicitly to these opaque vectors, so existing
+  // callers work.
+  py::bind_vector<ResidueCoordArray>(m, "ResidueCoordArray");
+  py::implicitly_convertible<py::iterable, ResidueCoordArray>();
+
+  m.def(
+      "residue_coords_from_numpy",
+      &ResidueCoordsFromNumpy,
+      py::arg("indices"),
+      py::arg("coords"),
+      "Build a ResidueCoordArray from (n_res,) indices and (n_res, n_atoms, 3) coords.");
+
   py::enum_<rna::BasePair::Type>(m, "BasePairType")
       .value("UNCLASSIFIED", rna::BasePair::Type::kUnclassified)
       .value("CANONICAL", rna::BasePair::Type::kCanonical)
@@ -64,6 +184,10 @@ PYBIND11_MODULE(rnaknotdetector_core, m) {
       .value("SINGLE_ATOM", rna::EvaluateOptions::PolylineMode::kSingleAtom)
       .value("PC4_ALTERNATING", rna::EvaluateOptions::PolylineMode::kPC4Alternating);
 
+  py::enum_<rna::EvaluateOptions::Precision>(m, "Precision")
+      .value("FP64", rna::EvaluateOptions::Precision::kFP64)
+      .value("FP32", rna::EvaluateOptions::Precision::kFP32);
+
   py::class_<rna::BasePair>(m, "BasePair")
       .def(py::init<int, int, rna::BasePair::Type>(),
            py::arg("i"),
@@ -97,6 +221,13 @@ PYBIND11_MODULE(rnaknotdetector_core, m) {
   py::class_<rna::Polygon2D>(m, "Polygon2D")
       .def(py::init<>())
       .def_readwrite("vertices", &rna::Polygon2D::vertices)
+      .def_property_readonly(
+          "vertices_np",
+          [](py::object self) {
+            const auto &poly = self.cast<const rna::Polygon2D &>();
+            return DoubleView(poly.vertices, {2}, self);
+          },
+          "Zero-copy read-only (n, 2) array over vertices.")
       .def_readwrite("valid", &rna::Polygon2D::valid);
 
   py::class_<rna::Surface>(m, "Surface")
@@ -106,8 +237,27 @@ PYBIND11_MODULE(rnaknotdetector_core, m) {
       .def_readwrite("plane", &rna::Surface::plane)
       .def_readwrite("polygon", &rna::Surface::polygon)
       .def_readwrite("triangles", &rna::Surface::triangles)
+      .def_property_readonly(
+          "triangles_np",
+          [](py::object self) {
+            const auto &surface = self.cast<const rna::Surface &>();
+            return DoubleView(surface.triangles, {3, 3}, self);
+          },
+          "Zero-copy read-only (n, 3, 3) array over triangles (a, b, c).")
       .def_readwrite("skip_residues", &rna::Surface::skip_residues);
 
+  py::bind_vector<SurfaceArray>(m, "SurfaceArray")
+      .def_property_readonly(
+          "valid_count",
+          [](const SurfaceArray &surfaces) {
+            return std::count_if(
+                surfaces.begin(), surfaces.end(), [](const rna::Surface &surface) {
+                  return surface.plane.valid && surface.polygon.valid;
+                });
+          },
+          "Number of surfaces whose plane and polygon are both valid.");
+  py::implicitly_convertible<py::iterable, SurfaceArray>();
+
   py::class_<rna::HitInfo>(m, "HitInfo")
       .def(py::init<>())
       .def_readwrite("loop_id", &rna::HitInfo::loop_id)
@@ -121,7 +271,19 @@ PYBIND11_MODULE(rnaknotdetector_core, m) {
   py::class_<rna::Result>(m, "Result")
       .def(py::init<>())
       .def_readwrite("K", &rna::Result::K)
-      .def_readwrite("hits", &rna::Result::hits);
+      .def_readwrite("hits", &rna::Result::hits)
+      .def_readwrite("n_surfaces", &rna::Result::n_surfaces)
+      .def_readwrite("n_valid_surfaces", &rna::Result::n_valid_surfaces)
+      .def_property_readonly(
+          "hits_array",
+          [](const rna::Result &result) { return HitsArray(result.hits); },
+          "Hits as a structured array (loop_id, segment_id, res_a, res_b, atom_a, "
+          "atom_b, x, y, z); atom_a/atom_b hold int(AtomKind).");
+
+  // Reusable work buffers; pass the same instance to build_surfaces and
+  // evaluate_entanglement to avoid reallocating them on every call. Calls
+  // run without the GIL, so give each Python thread its own arena.
+  py::class_<rna::ScratchArena>(m, "ScratchArena").def(py::init<>());
 
   m.def(
       "get_main_layer_pairs",
@@ -155,18 +317,25 @@ PYBIND11_MODULE(rnaknotdetector_core, m) {
 
   m.def(
       "build_surfaces",
-      [](const std::vector<rna::ResidueCoord> &coords,
+      [](const ResidueCoordArray &coords,
          const std::vector<rna::Loop> &loops,
          int atom_index,
          double eps_collinear,
          int surface_mode,
-         int multi_chunk) {
+         int multi_chunk,
+         int num_threads,
+         rna::ScratchArena *arena) {
         rna::SurfaceBuildOptions options;
         options.atom_index = atom_index;
         options.eps_collinear = eps_collinear;
         options.surface_mode = static_cast<rna::SurfaceMode>(surface_mode);
         options.multi_chunk = multi_chunk;
-        return rna::BuildSurfaces(coords, loops, options);
+        options.num_threads = num_threads;
+        // coords is an opaque vector that Python may mutate once the GIL is
+        // released, so the C++ side works on its own copy.
+        const ResidueCoordArray coords_copy = coords;
+        py::gil_scoped_release release;
+        return rna::BuildSurfaces(coords_copy, loops, options, arena);
       },
       py::arg("coords"),
       py::arg("loops"),
@@ -174,18 +343,24 @@ PYBIND11_MODULE(rnaknotdetector_core, m) {
       py::arg("eps_collinear") = 1e-6,
       py::arg("surface_mode") = static_cast<int>(rna::SurfaceMode::kTrianglePlanes),
       py::arg("multi_chunk") = 12,
-      "Build surfaces from loops and coordinates.");
+      py::arg("num_threads") = 0,
+      py::arg("arena") = nullptr,
+      "Build surfaces from loops and coordinates (num_threads=0: all cores).");
 
   m.def(
       "evaluate_entanglement",
-      [](const std::vector<rna::ResidueCoord> &coords,
-         const std::vector<rna::Surface> &surfaces,
+      [](const ResidueCoordArray &coords,
+         const SurfaceArray &surfaces,
          int atom_index,
          int atom_index_p,
          int atom_index_c4,
          int polyline_mode,
          double eps_plane,
-         double eps_polygon) {
+         double eps_polygon,
+         bool fast_reject,
+         int precision,
+         int num_threads,
+         rna::ScratchArena *arena) {
         rna::EvaluateOptions options;
         options.atom_index = atom_index;
         options.atom_index_p = atom_index_p;
@@ -194,7 +369,15 @@ PYBIND11_MODULE(rnaknotdetector_core, m) {
             static_cast<rna::EvaluateOptions::PolylineMode>(polyline_mode);
         options.eps_plane = eps_plane;
         options.eps_polygon = eps_polygon;
-        return rna::EvaluateEntanglement(coords, surfaces, options);
+        options.fast_reject = fast_reject;
+        options.precision =
+            static_cast<rna::EvaluateOptions::Precision>(precision);
+        options.num_threads = num_threads;
+        // Copies of the opaque inputs; see build_surfaces.
+        const ResidueCoordArray coords_copy = coords;
+        const SurfaceArray surfaces_copy = surfaces;
+        py::gil_scoped_release release;
+        return rna::EvaluateEntanglement(coords_copy, surfaces_copy, options, arena);
       },
       py::arg("coords"),
       py::arg("surfaces"),
@@ -205,5 +388,69 @@ PYBIND11_MODULE(rnaknotdetector_core, m) {
           static_cast<int>(rna::EvaluateOptions::PolylineMode::kSingleAtom),
       py::arg("eps_plane") = 1e-2,
       py::arg("eps_polygon") = 1e-2,
-      "Evaluate entanglement for surfaces.");
+      py::arg("fast_reject") = false,
+      py::arg("precision") =
+          static_cast<int>(rna::EvaluateOptions::Precision::kFP64),
+      py::arg("num_threads") = 0,
+      py::arg("arena") = nullptr,
+      "Evaluate entanglement for surfaces (num_threads=0: all cores).");
+
+  m.def(
+      "detect_entanglement",
+      [](const ResidueCoordArray &coords,
+         const std::vector<rna::Loop> &loops,
+         int atom_index,
+         double eps_collinear,
+         int surface_mode,
+         int multi_chunk,
+         int atom_index_p,
+         int atom_index_c4,
+         int polyline_mode,
+         double eps_plane,
+         double eps_polygon,
+         bool fast_reject,
+         int precision,
+         int num_threads,
+         rna::ScratchArena *arena) {
+        rna::SurfaceBuildOptions surface_options;
+        surface_options.atom_index = atom_index;
+        surface_options.eps_collinear = eps_collinear;
+        surface_options.surface_mode = static_cast<rna::SurfaceMode>(surface_mode);
+        surface_options.multi_chunk = multi_chunk;
+        rna::EvaluateOptions options;
+        options.atom_index = atom_index;
+        options.atom_index_p = atom_index_p;
+        options.atom_index_c4 = atom_index_c4;
+        options.polyline_mode =
+            static_cast<rna::EvaluateOptions::PolylineMode>(polyline_mode);
+        options.eps_plane = eps_plane;
+        options.eps_polygon = eps_polygon;
+        options.fast_reject = fast_reject;
+        options.precision =
+            static_cast<rna::EvaluateOptions::Precision>(precision);
+        options.num_threads = num_threads;
+        // Copy of the opaque input; see build_surfaces.
+        const ResidueCoordArray coords_copy = coords;
+        py::gil_scoped_release release;
+        return rna::DetectEntanglement(
+            coords_copy, loops, surface_options, options, arena);
+      },
+      py::arg("coords"),
+      py::arg("loops"),
+      py::arg("atom_index") = 0,
+      py::arg("eps_collinear") = 1e-6,
+      py::arg("surface_mode") = static_cast<int>(rna::SurfaceMode::kTrianglePlanes),
+      py::arg("multi_chunk") = 12,
+      py::arg("atom_index_p") = 0,
+      py::arg("atom_index_c4") = 1,
+      py::arg("polyline_mode") =
+          static_cast<int>(rna::EvaluateOptions::PolylineMode::kSingleAtom),
+      py::arg("eps_plane") = 1e-2,
+      py::arg("eps_polygon") = 1e-2,
+      py::arg("fast_reject") = false,
+      py::arg("precision") =
+          static_cast<int>(rna::EvaluateOptions::Precision::kFP64),
+      py::arg("num_threads") = 0,
+      py::arg("arena") = nullptr,
+      "build_surfaces + evaluate_entanglement in one pass, without keeping the surfaces.");
 }
@@ -2,6 +2,7 @@
 
 #include <algorithm>
 #include <cmath>
+#include <cstdint>
 #include <vector>
 
 #include "entanglement.h"
@@ -54,15 +55,17 @@ inline bool IsFiniteCoord(const Vec3 &v) {
   return std::isfinite(v.x) && std::isfinite(v.y) && std::isfinite(v.z);
 }
 
-inline CoordMap BuildCoordMap(const std::vector<ResidueCoord> &coords, int atom_index) {
+// Fill *map in place so callers holding a ScratchArena keep the buffer capacity.
+inline void BuildCoordMapInto(const std::vector<ResidueCoord> &coords,
+                              int atom_index,
+                              CoordMap *map) {
   int max_index = 0;
   for (const auto &res : coords) {
     max_index = std::max(max_index, res.res_index);
   }
-  CoordMap map;
-  map.n_res = max_index;
-  map.coords.resize(max_index + 1);
-  map.has_coord.assign(max_index + 1, 0);
+  map->n_res = max_index;
+  map->coords.resize(max_index + 1);
+  map->has_coord.assign(max_index + 1, 0);
   for (const auto &res : coords) {
     if (res.res_index <= 0 || res.res_index > max_index) {
       continue;
@@ -74,43 +77,45 @@ inline CoordMap BuildCoordMap(const std::vector<ResidueCoord> &coords, int atom_
     if (!IsFiniteCoord(v)) {
       continue;
     }
-    map.coords[res.res_index] = v;
-    map.has_coord[res.res_index] = 1;
+    map->coords[res.res_index] = v;
+    map->has_coord[res.res_index] = 1;
   }
+}
+
+inline CoordMap BuildCoordMap(const std::vector<ResidueCoord> &coords, int atom_index) {
+  CoordMap map;
+  BuildCoordMapInto(coords, atom_index, &map);
   return map;
 }
 
-inline std::vector<PolylinePoint> BuildPolylinePoints(
-    const std::vector<ResidueCoord> &coords,
-    int atom_index_p,
-    int atom_index_c4) {
-  std::vector<PolylinePoint> points;
-  CoordMap map_p = BuildCoordMap(coords, atom_index_p);
-  CoordMap map_c4 = BuildCoordMap(coords, atom_index_c4);
+// Interleave P and C4' points per residue from already-built coordinate maps.
+inline void BuildPolylinePointsInto(const CoordMap &map_p,
+                                    const CoordMap &map_c4,
+                                    std::vector<PolylinePoint> *points) {
+  points->clear();
   int n_res = std::max(map_p.n_res, map_c4.n_res);
-  points.reserve(n_res * 2);
+  points->reserve(n_res * 2);
   for (int i = 1; i <= n_res; ++i) {
     if (i <= map_p.n_res && map_p.has_coord[i]) {
-      points.push_back(PolylinePoint{i, AtomKind::kP, map_p.coords[i]});
+      points->push_back(PolylinePoint{i, AtomKind::kP, map_p.coords[i]});
     }
     if (i <= map_c4.n_res && map_c4.has_coord[i]) {
-      points.push_back(PolylinePoint{i, AtomKind::kC4, map_c4.coords[i]});
+      points->push_back(PolylinePoint{i, AtomKind::kC4, map_c4.coords[i]});
     }
   }
-  return points;
 }
 
-inline std::vector<Segment> BuildSegmentsFromPolyline(
-    const std::vector<PolylinePoint> &points) {
-  std::vector<Segment> segments;
+inline void BuildSegmentsFromPolylineInto(const std::vector<PolylinePoint> &points,
+                                          std::vector<Segment> *segments) {
+  segments->clear();
   if (points.size() < 2) {
-    return segments;
+    return;
   }
-  segments.reserve(points.size() - 1);
+  segments->reserve(points.size() - 1);
   for (size_t i = 0; i + 1 < points.size(); ++i) {
     const auto &a = points[i];
     const auto &b = points[i + 1];
-    segments.push_back(
+    segments->push_back(
         Segment{static_cast<int>(i + 1),
                 a.res_index,
                 b.res_index,
@@ -119,7 +124,41 @@ inline std::vector<Segment> BuildSegmentsFromPolyline(
                 a.point,
                 b.point});
   }
-  return segments;
 }
 
+// Per-worker buffers of a ScratchArena; one per thread in parallel sections.
+struct WorkerScratch {
+  std::vector<char> mask;  // per-residue flags; kept all zero between uses
+  std::vector<Vec3> boundary_points;
+  std::vector<Vec2> poly2d;
+  std::vector<Vec3> poly3d;
+  std::vector<uint8_t> reject_codes;  // EvaluateOptions::fast_reject
+  std::vector<Vec3f> triangles_f32;   // 3 per triangle, Precision::kFP32
+};
+
+// Reusable work buffers for BuildSurfaces / EvaluateEntanglement.
+// Passing the same arena to consecutive calls keeps vector capacity around
+// instead of reallocating per call and per surface. An arena must not be
+// shared by concurrent calls.
+struct ScratchArena {
+  CoordMap map;
+  CoordMap surface_map;  // BuildSurfaces, or a different surface atom when fused
+  CoordMap map_p;
+  CoordMap map_c4;
+  std::vector<PolylinePoint> points;
+  std::vector<Segment> segments;
+  std::vector<Vec3f> segments_f32;  // (a, b) per segment, Precision::kFP32
+  std::vector<WorkerScratch> workers;
+
+  // Make workers[0, n) available with an all-zero mask of n_res + 1 flags.
+  void PrepareWorkers(int n, int n_res) {
+    if (static_cast<int>(workers.size()) < n) {
+      workers.resize(n);
+    }
+    for (int w = 0; w < n; ++w) {
+      workers[w].mask.assign(n_res + 1, 0);
+    }
+  }
+};
+
 }  // namespace rna
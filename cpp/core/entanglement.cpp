@@ -1,16 +1,20 @@
 #include "entanglement.h"
 #include "coord_utils.h"
 #include "loop_utils.h"
+#include "parallel_utils.h"
 #include "pair_utils.h"
 #include "pseudoknot_decomposition.h"
+#include "surface_builder.h"
 
 #include <algorithm>
+#include <cmath>
 #include <cstdint>
 #include <cstdlib>
 #include <iostream>
 #include <stdexcept>
 #include <string>
 #include <unordered_set>
+#include <utility>
 
 namespace rna {
 namespace {
@@ -47,38 +51,85 @@ bool IsTargetMultiloop_debug(const std::vector<BasePair> &pairs) {
          sorted[2] == std::make_pair(98, 105);
 }
 
-std::vector<Segment> BuildSegments(const CoordMap &map) {
-  std::vector<Segment> segments;
+void BuildSegmentsInto(const CoordMap &map, std::vector<Segment> *segments) {
+  segments->clear();
   if (map.n_res <= 1) {
-    return segments;
+    return;
   }
-  segments.reserve(map.n_res);
+  segments->reserve(map.n_res);
   for (int i = 1; i < map.n_res; ++i) {
     if (!map.has_coord[i] || !map.has_coord[i + 1]) {
       continue;
     }
-    segments.push_back(
+    segments->push_back(
         Segment{i, i, i + 1, AtomKind::kSingle, AtomKind::kSingle, map.coords[i], map.coords[i + 1]});
   }
-  return segments;
 }
 
-std::vector<Segment> BuildSegmentsPC4(const std::vector<ResidueCoord> &coords,
-                                      int atom_index_p,
-                                      int atom_index_c4) {
-  std::vector<PolylinePoint> points =
-      BuildPolylinePoints(coords, atom_index_p, atom_index_c4);
-  return BuildSegmentsFromPolyline(points);
+void BuildSegmentsPC4Into(const CoordMap &map_p,
+                          const CoordMap &map_c4,
+                          ScratchArena *arena) {
+  BuildPolylinePointsInto(map_p, map_c4, &arena->points);
+  BuildSegmentsFromPolylineInto(arena->points, &arena->segments);
 }
 
-std::vector<char> BuildSkipMask(const Surface &surface, int n_res) {
-  std::vector<char> skip_mask(n_res + 1, 0);
+// Mark the surface's skip residues in `mask` (all zero on entry); ClearSkipMask undoes it.
+void FillSkipMask(const Surface &surface, int n_res, std::vector<char> *mask) {
   for (int idx : surface.skip_residues) {
     if (idx > 0 && idx <= n_res) {
-      skip_mask[idx] = 1;
+      (*mask)[idx] = 1;
     }
   }
-  return skip_mask;
+}
+
+void ClearSkipMask(const Surface &surface, int n_res, std::vector<char> *mask) {
+  for (int idx : surface.skip_residues) {
+    if (idx > 0 && idx <= n_res) {
+      (*mask)[idx] = 0;
+    }
+  }
+}
+
+// Diagonal-plane pre-classification for segment-vs-triangle tests.
+// F1 / F2 are the planes through the segment's line parallel to the y / x
+// axis, so F1 only looks at (x, z) and F2 at (y, z). Each vertex gets the
+// bits {F1 > tol, F1 < -tol, F2 > tol, F2 < -tol}; when the AND of a
+// triangle's three codes is non-zero all its vertices lie strictly on one
+// side of a plane containing the line, and the line cannot meet it.
+struct DiagonalPlanes {
+  explicit DiagonalPlanes(const Segment &segment)
+      : a(segment.a), d(Sub(segment.b, segment.a)) {
+    // Tolerances are distances from each plane (1e-9 in coordinate units).
+    tol1 = 1e-9 * std::sqrt(d.x * d.x + d.z * d.z);
+    tol2 = 1e-9 * std::sqrt(d.y * d.y + d.z * d.z);
+  }
+
+  uint8_t Code(const Vec3 &v) const {
+    double f1 = d.x * (v.z - a.z) - d.z * (v.x - a.x);
+    double f2 = d.y * (v.z - a.z) - d.z * (v.y - a.y);
+    return static_cast<uint8_t>((f1 > tol1) | ((f1 < -tol1) << 1) |
+                                ((f2 > tol2) << 2) | ((f2 < -tol2) << 3));
+  }
+
+  Vec3 a;
+  Vec3 d;
+  double tol1 = 0.0;
+  double tol2 = 0.0;
+};
+
+// Store one AND-ed vertex code per triangle in *codes; return their AND.
+uint8_t ClassifyTriangles(const DiagonalPlanes &planes,
+                          const std::vector<Triangle> &triangles,
+                          std::vector<uint8_t> *codes) {
+  codes->resize(triangles.size());
+  uint8_t all = 0x0f;
+  for (size_t t = 0; t < triangles.size(); ++t) {
+    const Triangle &tri = triangles[t];
+    uint8_t code = planes.Code(tri.a) & planes.Code(tri.b) & planes.Code(tri.c);
+    (*codes)[t] = code;
+    all &= code;
+  }
+  return all;
 }
 
 }  // namespace
@@ -128,180 +179,355 @@ std::vector<BasePair> ExtractMainLayer(const std::vector<BasePair> &base_pairs)
   return ExtractMainLayerFromBasePairs(base_pairs);
 }
 
-Result EvaluateEntanglement(const std::vector<ResidueCoord> &coords,
-                            const std::vector<Surface> &surfaces,
-                            const EvaluateOptions &options) {
-  Result result;
-  const bool debug = DebugEnabled();
-  CoordMap map = BuildCoordMap(coords, options.atom_index);
-  std::vector<Segment> segments;
-  if (options.polyline_mode == EvaluateOptions::PolylineMode::kPC4Alternating) {
-    segments = BuildSegmentsPC4(coords, options.atom_index_p, options.atom_index_c4);
-  } else {
-    segments = BuildSegments(map);
+namespace {
+
+// Test every segment against one surface and append its hits; duplicates
+// across surfaces of the same loop are dropped by the caller.
+// `scratch->mask` holds n_res + 1 zero flags on entry and again on return.
+// kFastReject / kFP32 mirror EvaluateOptions::fast_reject / precision so the
+// per-segment, per-triangle loop carries no runtime option branches;
+// SelectSurfaceKernel picks the instantiation once per call.
+template <bool kFastReject, bool kFP32>
+void EvaluateSurface(const Surface &surface,
+                     const std::vector<Segment> &segments,
+                     int n_res,
+                     const EvaluateOptions &options,
+                     bool debug,
+                     WorkerScratch *scratch,
+                     const std::vector<Vec3f> *segments_f32,
+                     std::vector<HitInfo> *hits) {
+  static const std::unordered_set<int> debug_segments = {46, 89, 143};
+  std::vector<char> &skip_mask = scratch->mask;
+  const float eps_triangle_f32 = static_cast<float>(options.eps_triangle);
+  bool watch_target_multiloop =
+      debug && (surface.kind == LoopKind::kMulti &&
+                IsTargetMultiloop_debug(surface.closing_pairs));
+  bool use_triangles = !surface.triangles.empty();
+  if (!use_triangles && (!surface.plane.valid || !surface.polygon.valid)) {
+    return;
   }
-  if (segments.empty()) {
-    return result;
+  FillSkipMask(surface, n_res, &skip_mask);
+  if constexpr (kFP32) {
+    std::vector<Vec3f> &tri_f32 = scratch->triangles_f32;
+    tri_f32.clear();
+    for (const auto &tri : surface.triangles) {
+      tri_f32.push_back(ToVec3f(tri.a));
+      tri_f32.push_back(ToVec3f(tri.b));
+      tri_f32.push_back(ToVec3f(tri.c));
+    }
+  }
+  if (watch_target_multiloop) {
+    std::cerr << "[debug] target_multiloop triangles=" << surface.triangles.size()
+              << "\n";
   }
-  const std::unordered_set<int> debug_segments = {46, 89, 143};
+  for (size_t seg_pos = 0; seg_pos < segments.size(); ++seg_pos) {
+    const Segment &segment = segments[seg_pos];
+    int segment_index = segment.id;
+    int res_a = segment.res_a;
+    int res_b = segment.res_b;
+    bool watch_segment = debug && (debug_segments.count(segment_index) > 0);
+    auto log_with_loop = [&](const char *status) {
+      if (!debug) {
+        return;
+      }
+      std::cerr << "[debug] loop=" << surface.loop_id
+                << " type=" << static_cast<int>(surface.kind)
+                << " pairs=";
+      for (size_t idx = 0; idx < surface.closing_pairs.size(); ++idx) {
+        const auto &bp = surface.closing_pairs[idx];
+        std::cerr << "(" << bp.i << "," << bp.j << ")";
+        if (idx + 1 < surface.closing_pairs.size()) {
+          std::cerr << ",";
+        }
+      }
+      std::cerr << " segment=(" << res_a << "," << res_b << ") " << status;
+    };
 
-  std::unordered_set<int64_t> hit_keys;
-  for (const auto &surface : surfaces) {
-    bool watch_target_multiloop =
-        debug && (surface.kind == LoopKind::kMulti &&
-                  IsTargetMultiloop_debug(surface.closing_pairs));
-    std::vector<char> skip_mask = BuildSkipMask(surface, map.n_res);
-    bool use_triangles = !surface.triangles.empty();
-    if (!use_triangles && (!surface.plane.valid || !surface.polygon.valid)) {
+    if ((res_a > 0 && res_a <= n_res && skip_mask[res_a]) ||
+        (res_b > 0 && res_b <= n_res && skip_mask[res_b])) {
+      if (watch_target_multiloop && segment_index == 46) {
+        std::cerr << "[debug] target_multiloop loop=" << surface.loop_id
+                  << " segment=46 skipped_by_mask\n";
+      }
+      if (watch_segment) {
+        log_with_loop("skipped_by_mask\n");
+      }
       continue;
     }
-    if (watch_target_multiloop) {
-      std::cerr << "[debug] target_multiloop triangles=" << surface.triangles.size()
-                << "\n";
+    if (watch_target_multiloop && segment_index == 46) {
+      std::cerr << "[debug] target_multiloop segment46 a=("
+                << segment.a.x << "," << segment.a.y << "," << segment.a.z
+                << ") b=(" << segment.b.x << "," << segment.b.y << ","
+                << segment.b.z << ")\n";
+      if (!surface.triangles.empty()) {
+        const auto &tri = surface.triangles.front();
+        std::cerr << "[debug] target_multiloop tri0 a=(" << tri.a.x << ","
+                  << tri.a.y << "," << tri.a.z << ") b=(" << tri.b.x << ","
+                  << tri.b.y << "," << tri.b.z << ") c=(" << tri.c.x << ","
+                  << tri.c.y << "," << tri.c.z << ")\n";
+      }
     }
-    for (const auto &segment : segments) {
-      int segment_index = segment.id;
-      int res_a = segment.res_a;
-      int res_b = segment.res_b;
-      bool watch_segment = debug && (debug_segments.count(segment_index) > 0);
-      auto log_with_loop = [&](const char *status) {
-        if (!debug) {
-          return;
+    Vec3 intersection;
+    bool hit = false;
+    if (use_triangles) {
+      int triangle_tests = 0;
+      // With fast_reject, reject_codes[t] != 0 means triangle t cannot be hit;
+      // a non-zero AND over all triangles rejects the whole surface.
+      bool surface_rejected =
+          kFastReject &&
+          ClassifyTriangles(DiagonalPlanes(segment), surface.triangles,
+                            &scratch->reject_codes) != 0;
+      for (size_t t = 0; t < surface.triangles.size() && !surface_rejected; ++t) {
+        if (kFastReject && scratch->reject_codes[t] != 0) {
+          continue;
         }
-        std::cerr << "[debug] loop=" << surface.loop_id
-                  << " type=" << static_cast<int>(surface.kind)
-                  << " pairs=";
-        for (size_t idx = 0; idx < surface.closing_pairs.size(); ++idx) {
-          const auto &bp = surface.closing_pairs[idx];
-          std::cerr << "(" << bp.i << "," << bp.j << ")";
-          if (idx + 1 < surface.closing_pairs.size()) {
-            std::cerr << ",";
+        triangle_tests++;
+        if constexpr (kFP32) {
+          const Vec3f *ab = &(*segments_f32)[2 * seg_pos];
+          float t_hit = 0.0f;
+          if (SegmentIntersectsTriangleF32(ab[0], ab[1], &scratch->triangles_f32[3 * t],
+                                           eps_triangle_f32, &t_hit)) {
+            intersection = Add(segment.a, Scale(Sub(segment.b, segment.a), t_hit));
+            hit = true;
+            break;
           }
+        } else if (SegmentIntersectsTriangle(segment.a, segment.b, surface.triangles[t],
+                                             options.eps_triangle, &intersection)) {
+          hit = true;
+          break;
         }
-        std::cerr << " segment=(" << res_a << "," << res_b << ") " << status;
-      };
-
-      if ((res_a > 0 && res_a <= map.n_res && skip_mask[res_a]) ||
-          (res_b > 0 && res_b <= map.n_res && skip_mask[res_b])) {
+      }
+      if (watch_target_multiloop && segment_index == 46) {
+        std::cerr << "[debug] target_multiloop loop=" << surface.loop_id
+                  << " segment=46 triangle_"
+                  << (hit ? "hit" : "miss")
+                  << " tests=" << triangle_tests << "\n";
+      }
+    } else {
+      if (!SegmentPlaneIntersection(segment.a, segment.b, surface.plane, options.eps_plane,
+                                    &intersection)) {
         if (watch_target_multiloop && segment_index == 46) {
+          double d_a = Dot(Sub(segment.a, surface.plane.c), surface.plane.n_hat);
+          double d_b = Dot(Sub(segment.b, surface.plane.c), surface.plane.n_hat);
           std::cerr << "[debug] target_multiloop loop=" << surface.loop_id
-                    << " segment=46 skipped_by_mask\n";
+                    << " segment=46 plane_miss d_a=" << d_a
+                    << " d_b=" << d_b << "\n";
         }
         if (watch_segment) {
-          log_with_loop("skipped_by_mask\n");
+          log_with_loop("plane_miss\n");
         }
         continue;
       }
       if (watch_target_multiloop && segment_index == 46) {
-        std::cerr << "[debug] target_multiloop segment46 a=("
-                  << segment.a.x << "," << segment.a.y << "," << segment.a.z
-                  << ") b=(" << segment.b.x << "," << segment.b.y << ","
-                  << segment.b.z << ")\n";
-        if (!surface.triangles.empty()) {
-          const auto &tri = surface.triangles.front();
-          std::cerr << "[debug] target_multiloop tri0 a=(" << tri.a.x << ","
-                    << tri.a.y << "," << tri.a.z << ") b=(" << tri.b.x << ","
-                    << tri.b.y << "," << tri.b.z << ") c=(" << tri.c.x << ","
-                    << tri.c.y << "," << tri.c.z << ")\n";
-        }
+        std::cerr << "[debug] target_multiloop loop=" << surface.loop_id
+                  << " segment=46 plane_hit"
+                  << " point=(" << intersection.x << "," << intersection.y << ","
+                  << intersection.z << ")\n";
       }
-      Vec3 intersection;
-      bool hit = false;
-      if (use_triangles) {
-        int triangle_tests = 0;
-        for (const auto &tri : surface.triangles) {
-          triangle_tests++;
-          if (SegmentIntersectsTriangle(segment.a, segment.b, tri,
-                                        options.eps_triangle, &intersection)) {
-            hit = true;
-            break;
-          }
-        }
-        if (watch_target_multiloop && segment_index == 46) {
-          std::cerr << "[debug] target_multiloop loop=" << surface.loop_id
-                    << " segment=46 triangle_"
-                    << (hit ? "hit" : "miss")
-                    << " tests=" << triangle_tests << "\n";
-        }
-      } else {
-        if (!SegmentPlaneIntersection(segment.a, segment.b, surface.plane, options.eps_plane,
-                                      &intersection)) {
-          if (watch_target_multiloop && segment_index == 46) {
-            double d_a = Dot(Sub(segment.a, surface.plane.c), surface.plane.n_hat);
-            double d_b = Dot(Sub(segment.b, surface.plane.c), surface.plane.n_hat);
-            std::cerr << "[debug] target_multiloop loop=" << surface.loop_id
-                      << " segment=46 plane_miss d_a=" << d_a
-                      << " d_b=" << d_b << "\n";
-          }
-          if (watch_segment) {
-            log_with_loop("plane_miss\n");
-          }
-          continue;
-        }
-        if (watch_target_multiloop && segment_index == 46) {
-          std::cerr << "[debug] target_multiloop loop=" << surface.loop_id
-                    << " segment=46 plane_hit"
-                    << " point=(" << intersection.x << "," << intersection.y << ","
-                    << intersection.z << ")\n";
-        }
-        Vec3 d = Sub(intersection, surface.plane.c);
-        Vec2 q{Dot(d, surface.plane.e1), Dot(d, surface.plane.e2)};
-        bool in_poly = PointInPolygon2D(q, surface.polygon, options.eps_polygon);
-        if (watch_target_multiloop && segment_index == 46) {
-          std::cerr << "[debug] target_multiloop loop=" << surface.loop_id
-                    << " segment=46 in_polygon=" << in_poly
-                    << " q=(" << q.x << "," << q.y << ")\n";
-        }
-        if (watch_segment) {
-          double min_x = 0.0;
-          double min_y = 0.0;
-          double max_x = 0.0;
-          double max_y = 0.0;
-          bool bbox_init = false;
-          for (const auto &v : surface.polygon.vertices) {
-            if (!bbox_init) {
-              min_x = max_x = v.x;
-              min_y = max_y = v.y;
-              bbox_init = true;
-              continue;
-            }
-            min_x = std::min(min_x, v.x);
-            min_y = std::min(min_y, v.y);
-            max_x = std::max(max_x, v.x);
-            max_y = std::max(max_y, v.y);
-          }
-          log_with_loop("plane_hit");
-          std::cerr << " in_polygon=" << in_poly
-                    << " q=(" << q.x << "," << q.y << ")"
-                    << " poly_n=" << surface.polygon.vertices.size();
-          if (bbox_init) {
-            std::cerr << " poly_bbox=[(" << min_x << "," << min_y << "),("
-                      << max_x << "," << max_y << ")]";
+      Vec3 d = Sub(intersection, surface.plane.c);
+      Vec2 q{Dot(d, surface.plane.e1), Dot(d, surface.plane.e2)};
+      bool in_poly = PointInPolygon2D(q, surface.polygon, options.eps_polygon);
+      if (watch_target_multiloop && segment_index == 46) {
+        std::cerr << "[debug] target_multiloop loop=" << surface.loop_id
+                  << " segment=46 in_polygon=" << in_poly
+                  << " q=(" << q.x << "," << q.y << ")\n";
+      }
+      if (watch_segment) {
+        double min_x = 0.0;
+        double min_y = 0.0;
+        double max_x = 0.0;
+        double max_y = 0.0;
+        bool bbox_init = false;
+        for (const auto &v : surface.polygon.vertices) {
+          if (!bbox_init) {
+            min_x = max_x = v.x;
+            min_y = max_y = v.y;
+            bbox_init = true;
+            continue;
           }
-          std::cerr << "\n";
+          min_x = std::min(min_x, v.x);
+          min_y = std::min(min_y, v.y);
+          max_x = std::max(max_x, v.x);
+          max_y = std::max(max_y, v.y);
         }
-        if (!in_poly) {
-          continue;
+        log_with_loop("plane_hit");
+        std::cerr << " in_polygon=" << in_poly
+                  << " q=(" << q.x << "," << q.y << ")"
+                  << " poly_n=" << surface.polygon.vertices.size();
+        if (bbox_init) {
+          std::cerr << " poly_bbox=[(" << min_x << "," << min_y << "),("
+                    << max_x << "," << max_y << ")]";
         }
-        hit = true;
+        std::cerr << "\n";
       }
-      if (!hit) {
+      if (!in_poly) {
         continue;
       }
-      int64_t key = HitKey(surface.loop_id, segment.id);
-      if (hit_keys.insert(key).second) {
-        result.hits.push_back(
-            HitInfo{surface.loop_id,
-                    segment.id,
-                    segment.res_a,
-                    segment.res_b,
-                    segment.atom_a,
-                    segment.atom_b,
-                    intersection});
+      hit = true;
+    }
+    if (!hit) {
+      continue;
+    }
+    hits->push_back(HitInfo{surface.loop_id,
+                            segment.id,
+                            segment.res_a,
+                            segment.res_b,
+                            segment.atom_a,
+                            segment.atom_b,
+                            intersection});
+  }
+  ClearSkipMask(surface, n_res, &skip_mask);
+}
+
+using SurfaceKernel = void (*)(const Surface &,
+                               const std::vector<Segment> &,
+                               int,
+                               const EvaluateOptions &,
+                               bool,
+                               WorkerScratch *,
+                               const std::vector<Vec3f> *,
+                               std::vector<HitInfo> *);
+
+SurfaceKernel SelectSurfaceKernel(const EvaluateOptions &options) {
+  const bool fp32 = options.precision == EvaluateOptions::Precision::kFP32;
+  if (options.fast_reject) {
+    return fp32 ? &EvaluateSurface<true, true> : &EvaluateSurface<true, false>;
+  }
+  return fp32 ? &EvaluateSurface<false, true> : &EvaluateSurface<false, false>;
+}
+
+// Fill arena->map (evaluation atom) and arena->segments for `options`.
+// Returns the FP32 segment copies for Precision::kFP32, nullptr otherwise.
+const std::vector<Vec3f> *PrepareSegments(const std::vector<ResidueCoord> &coords,
+                                          const EvaluateOptions &options,
+                                          ScratchArena *arena) {
+  CoordMap &map = arena->map;
+  BuildCoordMapInto(coords, options.atom_index, &map);
+  if (options.polyline_mode == EvaluateOptions::PolylineMode::kPC4Alternating) {
+    BuildCoordMapInto(coords, options.atom_index_c4, &arena->map_c4);
+    // `map` already holds the P atoms in the default layout (atom_index == atom_index_p).
+    if (options.atom_index_p == options.atom_index) {
+      BuildSegmentsPC4Into(map, arena->map_c4, arena);
+    } else {
+      BuildCoordMapInto(coords, options.atom_index_p, &arena->map_p);
+      BuildSegmentsPC4Into(arena->map_p, arena->map_c4, arena);
+    }
+  } else {
+    BuildSegmentsInto(map, &arena->segments);
+  }
+  if (options.precision != EvaluateOptions::Precision::kFP32) {
+    return nullptr;
+  }
+  arena->segments_f32.clear();
+  arena->segments_f32.reserve(2 * arena->segments.size());
+  for (const auto &segment : arena->segments) {
+    arena->segments_f32.push_back(ToVec3f(segment.a));
+    arena->segments_f32.push_back(ToVec3f(segment.b));
+  }
+  return &arena->segments_f32;
+}
+
+// Concatenate per-task hits in task order, dropping repeated (loop, segment)
+// pairs, so the output matches a serial run exactly.
+void MergeHits(std::vector<std::vector<HitInfo>> *groups, Result *result) {
+  std::unordered_set<int64_t> hit_keys;
+  for (auto &hits : *groups) {
+    for (auto &hit : hits) {
+      if (hit_keys.insert(HitKey(hit.loop_id, hit.segment_id)).second) {
+        result->hits.push_back(std::move(hit));
+      }
+    }
+  }
+  result->K = static_cast<int>(result->hits.size());
+}
+
+}  // namespace
+
+Result EvaluateEntanglement(const std::vector<ResidueCoord> &coords,
+                            const std::vector<Surface> &surfaces,
+                            const EvaluateOptions &options,
+                            ScratchArena *arena) {
+  Result result;
+  const bool debug = DebugEnabled();
+  ScratchArena local_arena;
+  if (arena == nullptr) {
+    arena = &local_arena;
+  }
+  const std::vector<Vec3f> *segments_f32 = PrepareSegments(coords, options, arena);
+  const std::vector<Segment> &segments = arena->segments;
+  const int n_res = arena->map.n_res;
+  if (segments.empty()) {
+    return result;
+  }
+  // Debug tracing writes per-surface lines to std::cerr; keep it serial and ordered.
+  const int num_threads = debug ? 1 : options.num_threads;
+  const int n_surfaces = static_cast<int>(surfaces.size());
+  arena->PrepareWorkers(ParallelWorkers(n_surfaces, num_threads), n_res);
+  const SurfaceKernel evaluate_surface = SelectSurfaceKernel(options);
+  std::vector<std::vector<HitInfo>> surface_hits(surfaces.size());
+  ParallelFor(n_surfaces, num_threads, [&](int i, int worker) {
+    evaluate_surface(surfaces[i], segments, n_res, options, debug,
+                     &arena->workers[worker], segments_f32, &surface_hits[i]);
+  });
+  MergeHits(&surface_hits, &result);
+  return result;
+}
+
+Result DetectEntanglement(const std::vector<ResidueCoord> &coords,
+                          const std::vector<Loop> &loops,
+                          const SurfaceBuildOptions &surface_options,
+                          const EvaluateOptions &options,
+                          ScratchArena *arena) {
+  Result result;
+  const bool debug = DebugEnabled();
+  ScratchArena local_arena;
+  if (arena == nullptr) {
+    arena = &local_arena;
+  }
+  const std::vector<Vec3f> *segments_f32 = PrepareSegments(coords, options, arena);
+  const std::vector<Segment> &segments = arena->segments;
+  // Surfaces are still built without segments so that the counts are right.
+  const bool has_segments = !segments.empty();
+  const CoordMap *surface_map = &arena->map;
+  if (surface_options.atom_index != options.atom_index) {
+    BuildCoordMapInto(coords, surface_options.atom_index, &arena->surface_map);
+    surface_map = &arena->surface_map;
+  }
+  // Both maps come from the same coords, so they share n_res and the worker masks.
+  const int n_res = arena->map.n_res;
+  const int num_threads = debug ? 1 : options.num_threads;
+  const int n_loops = static_cast<int>(loops.size());
+  const int workers = ParallelWorkers(n_loops, num_threads);
+  arena->PrepareWorkers(workers, n_res);
+  // Each loop's surfaces live only in its worker's buffer while the polyline
+  // is tested against them; nothing is kept beyond the hits.
+  std::vector<std::vector<Surface>> worker_surfaces(workers);
+  const SurfaceKernel evaluate_surface = SelectSurfaceKernel(options);
+  std::vector<std::vector<HitInfo>> loop_hits(loops.size());
+  std::vector<int> loop_surface_count(loops.size(), 0);
+  std::vector<int> loop_valid_count(loops.size(), 0);
+  ParallelFor(n_loops, num_threads, [&](int i, int worker) {
+    std::vector<Surface> &loop_surfaces = worker_surfaces[worker];
+    loop_surfaces.clear();
+    BuildLoopSurfaces(loops[i], *surface_map, surface_options,
+                      &arena->workers[worker], &loop_surfaces);
+    loop_surface_count[i] = static_cast<int>(loop_surfaces.size());
+    for (const auto &surface : loop_surfaces) {
+      if (surface.plane.valid && surface.polygon.valid) {
+        ++loop_valid_count[i];
+      }
+      if (!has_segments) {
+        continue;
       }
+      evaluate_surface(surface, segments, n_res, options, debug,
+                       &arena->workers[worker], segments_f32, &loop_hits[i]);
     }
+  });
+  MergeHits(&loop_hits, &result);
+  for (int i = 0; i < n_loops; ++i) {
+    result.n_surfaces += loop_surface_count[i];
+    result.n_valid_surfaces += loop_valid_count[i];
   }
-  result.K = static_cast<int>(result.hits.size());
   return result;
 }
 
@@ -95,6 +95,9 @@ struct HitInfo {
 struct Result {
   int K = 0;
   std::vector<HitInfo> hits;
+  // Filled by DetectEntanglement, which does not return the surfaces it builds.
+  int n_surfaces = 0;
+  int n_valid_surfaces = 0;  // plane and polygon both valid
 };
 
 struct SurfaceBuildOptions {
@@ -102,6 +105,7 @@ struct SurfaceBuildOptions {
   double eps_collinear = 1e-6;  // ratio threshold for near-collinearity
   SurfaceMode surface_mode = SurfaceMode::kTrianglePlanes;
   int multi_chunk = 12;       // chunk size factor for multiloop boundary splitting
+  int num_threads = 0;        // worker threads over loops; 0 = hardware concurrency
 };
 
 struct EvaluateOptions {
@@ -116,8 +120,17 @@ struct EvaluateOptions {
   double eps_plane = 1e-2;
   double eps_polygon = 1e-2;
   double eps_triangle = 1e-8;
+  bool fast_reject = false;  // diagonal-plane pre-check before triangle tests
+  enum class Precision {
+    kFP64,
+    kFP32,  // segment/triangle tests on float copies of the coordinates
+  };
+  Precision precision = Precision::kFP64;
+  int num_threads = 0;  // worker threads over surfaces; 0 = hardware concurrency
 };
 
+struct ScratchArena;  // coord_utils.h
+
 std::vector<Loop> BuildLoops(const std::vector<BasePair> &base_pairs,
                              int n_res,
                              const LoopBuildOptions &options = {});
@@ -126,10 +139,20 @@ std::vector<BasePair> ExtractMainLayer(const std::vector<BasePair> &base_pairs);
 
 std::vector<Surface> BuildSurfaces(const std::vector<ResidueCoord> &coords,
                                    const std::vector<Loop> &loops,
-                                   const SurfaceBuildOptions &options = {});
+                                   const SurfaceBuildOptions &options = {},
+                                   ScratchArena *arena = nullptr);
 
 Result EvaluateEntanglement(const std::vector<ResidueCoord> &coords,
                             const std::vector<Surface> &surfaces,
-                            const EvaluateOptions &options = {});
+                            const EvaluateOptions &options = {},
+                            ScratchArena *arena = nullptr);
+
+// BuildSurfaces + EvaluateEntanglement in one pass: each loop's surfaces are
+// tested as soon as they are built and then dropped. Same hits, same order.
+Result DetectEntanglement(const std::vector<ResidueCoord> &coords,
+                          const std::vector<Loop> &loops,
+                          const SurfaceBuildOptions &surface_options = {},
+                          const EvaluateOptions &options = {},
+                          ScratchArena *arena = nullptr);
 
 }  // namespace rna
@@ -230,4 +230,43 @@ bool SegmentIntersectsTriangle(const Vec3 &a,
   return true;
 }
 
+bool SegmentIntersectsTriangleF32(const Vec3f &a,
+                                  const Vec3f &b,
+                                  const Vec3f *tri,
+                                  float eps,
+                                  float *out_t) {
+  // Same Moller-Trumbore steps as above, spelled out on floats.
+  const float dx = b.x - a.x, dy = b.y - a.y, dz = b.z - a.z;
+  const float e1x = tri[1].x - tri[0].x, e1y = tri[1].y - tri[0].y, e1z = tri[1].z - tri[0].z;
+  const float e2x = tri[2].x - tri[0].x, e2y = tri[2].y - tri[0].y, e2z = tri[2].z - tri[0].z;
+  const float px = dy * e2z - dz * e2y;
+  const float py = dz * e2x - dx * e2z;
+  const float pz = dx * e2y - dy * e2x;
+  const float det = e1x * px + e1y * py + e1z * pz;
+  if (std::abs(det) < eps) {
+    return false;
+  }
+  const float inv_det = 1.0f / det;
+  const float tx = a.x - tri[0].x, ty = a.y - tri[0].y, tz = a.z - tri[0].z;
+  const float u = (tx * px + ty * py + tz * pz) * inv_det;
+  if (u < 0.0f || u > 1.0f) {
+    return false;
+  }
+  const float qx = ty * e1z - tz * e1y;
+  const float qy = tz * e1x - tx * e1z;
+  const float qz = tx * e1y - ty * e1x;
+  const float v = (dx * qx + dy * qy + dz * qz) * inv_det;
+  if (v < 0.0f || u + v > 1.0f) {
+    return false;
+  }
+  const float t = (e2x * qx + e2y * qy + e2z * qz) * inv_det;
+  if (t <= 0.0f || t >= 1.0f) {
+    return false;
+  }
+  if (out_t != nullptr) {
+    *out_t = t;
+  }
+  return true;
+}
+
 }  // namespace rna
@@ -39,5 +39,12 @@ bool SegmentIntersectsTriangle(const Vec3 &a,
                                const Triangle &tri,
                                double eps,
                                Vec3 *out_point);
+// FP32 variant of SegmentIntersectsTriangle for a triangle stored as tri[0..2];
+// returns the segment parameter t of the hit in *out_t.
+bool SegmentIntersectsTriangleF32(const Vec3f &a,
+                                  const Vec3f &b,
+                                  const Vec3f *tri,
+                                  float eps,
+                                  float *out_t);
 
 }  // namespace rna
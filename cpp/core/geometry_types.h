@@ -13,4 +13,15 @@ struct Vec3 {
   double z;
 };
 
+// Single-precision copy of a Vec3 for the optional FP32 intersection kernel.
+struct Vec3f {
+  float x;
+  float y;
+  float z;
+};
+
+inline Vec3f ToVec3f(const Vec3 &v) {
+  return Vec3f{static_cast<float>(v.x), static_cast<float>(v.y), static_cast<float>(v.z)};
+}
+
 }  // namespace rna
@@ -0,0 +1,66 @@
+#pragma once
+
+#include <algorithm>
+#include <atomic>
+#include <exception>
+#include <thread>
+#include <vector>
+
+namespace rna {
+
+// 0 (or negative) means "use all hardware threads".
+inline int ResolveNumThreads(int num_threads) {
+  if (num_threads > 0) {
+    return num_threads;
+  }
+  unsigned int hw = std::thread::hardware_concurrency();
+  return hw > 0 ? static_cast<int>(hw) : 1;
+}
+
+inline int ParallelWorkers(int n, int num_threads) {
+  return std::max(1, std::min(ResolveNumThreads(num_threads), n));
+}
+
+// Run fn(index, worker) for index in [0, n) on up to num_threads workers.
+// Indices are handed out one at a time (dynamic scheduling); worker is in
+// [0, ParallelWorkers(n, num_threads)) so callers can keep per-worker scratch
+// state. Runs inline when a single worker suffices. The first exception
+// thrown is rethrown.
+template <typename Fn>
+void ParallelFor(int n, int num_threads, Fn &&fn) {
+  int workers = ParallelWorkers(n, num_threads);
+  if (workers <= 1) {
+    for (int i = 0; i < n; ++i) {
+      fn(i, 0);
+    }
+    return;
+  }
+  std::atomic<int> next{0};
+  std::exception_ptr error;
+  std::atomic<bool> failed{false};
+  auto run = [&](int worker) {
+    try {
+      for (int i = next.fetch_add(1); i < n && !failed.load(); i = next.fetch_add(1)) {
+        fn(i, worker);
+      }
+    } catch (...) {
+      if (!failed.exchange(true)) {
+        error = std::current_exception();
+      }
+    }
+  };
+  std::vector<std::thread> threads;
+  threads.reserve(workers - 1);
+  for (int w = 1; w < workers; ++w) {
+    threads.emplace_back(run, w);
+  }
+  run(0);
+  for (auto &t : threads) {
+    t.join();
+  }
+  if (error) {
+    std::rethrow_exception(error);
+  }
+}
+
+}  // namespace rna
@@ -11,6 +11,7 @@
 #include "geometry3d.h"
 #include "loop_utils.h"
 #include "pair_utils.h"
+#include "parallel_utils.h"
 
 namespace rna {
 namespace {
@@ -119,19 +120,25 @@ std::vector<std::array<int, 3>> EarClipTriangulate(
   return tris;
 }
 
-std::vector<int> BuildBoundaryIndices(const Loop &loop, int n_res) {
+void ResetSeen(const std::vector<int> &indices, std::vector<char> *seen) {
+  for (int res_index : indices) {
+    (*seen)[res_index] = 0;
+  }
+}
+
+// `seen` holds n_res + 1 zero flags on entry and is zeroed again before returning.
+std::vector<int> BuildBoundaryIndices(const Loop &loop, int n_res, std::vector<char> *seen) {
   std::vector<int> boundary_indices;
   boundary_indices.reserve(loop.boundary_residues.size() +
                            loop.closing_pairs.size() * 2);
-  std::vector<char> seen(n_res + 1, 0);
   auto add_index = [&](int res_index) {
     if (res_index <= 0 || res_index > n_res) {
       return;
     }
-    if (seen[res_index]) {
+    if ((*seen)[res_index]) {
       return;
     }
-    seen[res_index] = 1;
+    (*seen)[res_index] = 1;
     boundary_indices.push_back(res_index);
   };
 
@@ -143,6 +150,7 @@ std::vector<int> BuildBoundaryIndices(const Loop &loop, int n_res) {
       add_index(pair.i);
       add_index(pair.j);
     }
+    ResetSeen(boundary_indices, seen);
     return boundary_indices;
   }
 
@@ -190,22 +198,23 @@ std::vector<int> BuildBoundaryIndices(const Loop &loop, int n_res) {
       add_index(pair.j);
     }
   }
+  ResetSeen(boundary_indices, seen);
   return boundary_indices;
 }
 
-std::vector<int> BuildOrderedBoundaryIndices(const Loop &loop, int n_res) {
+// `seen` holds n_res + 1 zero flags on entry and is zeroed again before returning.
+std::vector<int> BuildOrderedBoundaryIndices(const Loop &loop, int n_res, std::vector<char> *seen) {
   std::vector<int> boundary_indices;
   boundary_indices.reserve(loop.boundary_residues.size() +
                            loop.closing_pairs.size() * 2);
-  std::vector<char> seen(n_res + 1, 0);
   auto add_index = [&](int res_index) {
     if (res_index <= 0 || res_index > n_res) {
       return;
     }
-    if (seen[res_index]) {
+    if ((*seen)[res_index]) {
       return;
     }
-    seen[res_index] = 1;
+    (*seen)[res_index] = 1;
     boundary_indices.push_back(res_index);
   };
   for (int res_index : loop.boundary_residues) {
@@ -215,6 +224,7 @@ std::vector<int> BuildOrderedBoundaryIndices(const Loop &loop, int n_res) {
     add_index(pair.i);
     add_index(pair.j);
   }
+  ResetSeen(boundary_indices, seen);
   std::sort(boundary_indices.begin(), boundary_indices.end());
   return boundary_indices;
 }
@@ -245,74 +255,107 @@ std::vector<std::vector<int>> SplitBoundaryIndices(const std::vector<int> &indic
 
 }  // namespace
 
-std::vector<Surface> BuildSurfaces(const std::vector<ResidueCoord> &coords,
-                                   const std::vector<Loop> &loops,
-                                   const SurfaceBuildOptions &options) {
-  CoordMap map = BuildCoordMap(coords, options.atom_index);
-  std::vector<Surface> surfaces;
-  surfaces.reserve(loops.size());
-  for (const auto &loop : loops) {
-    std::vector<std::vector<int>> boundary_groups;
-    if (loop.kind == LoopKind::kMulti) {
-      std::vector<int> ordered = BuildOrderedBoundaryIndices(loop, map.n_res);
-      boundary_groups = SplitBoundaryIndices(ordered, options.multi_chunk);
-    } else {
-      boundary_groups.push_back(BuildBoundaryIndices(loop, map.n_res));
-    }
+void BuildLoopSurfaces(const Loop &loop,
+                       const CoordMap &map,
+                       const SurfaceBuildOptions &options,
+                       WorkerScratch *scratch,
+                       std::vector<Surface> *out) {
+  std::vector<Vec3> &boundary_points = scratch->boundary_points;
+  std::vector<std::vector<int>> boundary_groups;
+  if (loop.kind == LoopKind::kMulti) {
+    std::vector<int> ordered =
+        BuildOrderedBoundaryIndices(loop, map.n_res, &scratch->mask);
+    boundary_groups = SplitBoundaryIndices(ordered, options.multi_chunk);
+  } else {
+    boundary_groups.push_back(
+        BuildBoundaryIndices(loop, map.n_res, &scratch->mask));
+  }
 
-    for (const auto &boundary_indices : boundary_groups) {
-      Surface surface;
-      surface.loop_id = loop.id;
-      surface.kind = loop.kind;
-      surface.closing_pairs = loop.closing_pairs;
-      surface.skip_residues = BuildSkipResidues(loop);
+  for (const auto &boundary_indices : boundary_groups) {
+    Surface surface;
+    surface.loop_id = loop.id;
+    surface.kind = loop.kind;
+    surface.closing_pairs = loop.closing_pairs;
+    surface.skip_residues = BuildSkipResidues(loop);
 
-      std::vector<Vec3> boundary_points;
-      boundary_points.reserve(boundary_indices.size());
-      for (int res_index : boundary_indices) {
-        if (!map.has_coord[res_index]) {
-          continue;
-        }
-        boundary_points.push_back(map.coords[res_index]);
+    boundary_points.clear();
+    for (int res_index : boundary_indices) {
+      if (!map.has_coord[res_index]) {
+        continue;
       }
-      if (options.surface_mode == SurfaceMode::kBestFitPlane) {
-        surface.plane = FitPlane(boundary_points, options.eps_collinear);
-        surface.polygon = ProjectPolygon(boundary_points, surface.plane);
-      } else {
-        surface.plane = FitPlane(boundary_points, options.eps_collinear);
-        surface.polygon.valid = false;
-        surface.polygon.vertices.clear();
-        if (surface.plane.valid && boundary_points.size() >= 3) {
-          std::vector<Vec2> poly2d;
-          std::vector<Vec3> poly3d;
-          poly2d.reserve(boundary_points.size());
-          poly3d.reserve(boundary_points.size());
-          for (const auto &p : boundary_points) {
-            Vec3 d = Sub(p, surface.plane.c);
-            double x = Dot(d, surface.plane.e1);
-            double y = Dot(d, surface.plane.e2);
-            Vec3 proj = Add(surface.plane.c,
-                            Add(Scale(surface.plane.e1, x),
-                                Scale(surface.plane.e2, y)));
-            poly2d.push_back(Vec2{x, y});
-            poly3d.push_back(proj);
-          }
-          surface.polygon.vertices = poly2d;
-          surface.polygon.valid = surface.polygon.vertices.size() >= 3;
-          std::vector<std::array<int, 3>> tris =
-              EarClipTriangulate(poly2d, 1e-12);
-          for (const auto &tri : tris) {
-            Triangle t{poly3d[tri[0]], poly3d[tri[1]], poly3d[tri[2]]};
-            Vec3 ab = Sub(t.b, t.a);
-            Vec3 ac = Sub(t.c, t.a);
-            double area = Norm(Cross(ab, ac));
-            if (area <= options.eps_collinear) {
-              continue;
-            }
-            surface.triangles.push_back(t);
+      boundary_points.push_back(map.coords[res_index]);
+    }
+    if (options.surface_mode == SurfaceMode::kBestFitPlane) {
+      surface.plane = FitPlane(boundary_points, options.eps_collinear);
+      surface.polygon = ProjectPolygon(boundary_points, surface.plane);
+    } else {
+      surface.plane = FitPlane(boundary_points, options.eps_collinear);
+      surface.polygon.valid = false;
+      surface.polygon.vertices.clear();
+      if (surface.plane.valid && boundary_points.size() >= 3) {
+        std::vector<Vec2> &poly2d = scratch->poly2d;
+        std::vector<Vec3> &poly3d = scratch->poly3d;
+        poly2d.clear();
+        poly3d.clear();
+        for (const auto &p : boundary_points) {
+          Vec3 d = Sub(p, surface.plane.c);
+          double x = Dot(d, surface.plane.e1);
+          double y = Dot(d, surface.plane.e2);
+          Vec3 proj = Add(surface.plane.c,
+                          Add(Scale(surface.plane.e1, x),
+                              Scale(surface.plane.e2, y)));
+          poly2d.push_back(Vec2{x, y});
+          poly3d.push_back(proj);
+        }
+        surface.polygon.vertices = poly2d;
+        surface.polygon.valid = surface.polygon.vertices.size() >= 3;
+        std::vector<std::array<int, 3>> tris =
+            EarClipTriangulate(poly2d, 1e-12);
+        surface.triangles.reserve(tris.size());
+        for (const auto &tri : tris) {
+          Triangle t{poly3d[tri[0]], poly3d[tri[1]], poly3d[tri[2]]};
+          Vec3 ab = Sub(t.b, t.a);
+          Vec3 ac = Sub(t.c, t.a);
+          double area = Norm(Cross(ab, ac));
+          if (area <= options.eps_collinear) {
+            continue;
           }
+          surface.triangles.push_back(t);
         }
       }
+    }
+    out->push_back(std::move(surface));
+  }
+}
+
+std::vector<Surface> BuildSurfaces(const std::vector<ResidueCoord> &coords,
+                                   const std::vector<Loop> &loops,
+                                   const SurfaceBuildOptions &options,
+                                   ScratchArena *arena) {
+  ScratchArena local_arena;
+  if (arena == nullptr) {
+    arena = &local_arena;
+  }
+  CoordMap &map = arena->surface_map;
+  BuildCoordMapInto(coords, options.atom_index, &map);
+  const int n_loops = static_cast<int>(loops.size());
+  arena->PrepareWorkers(ParallelWorkers(n_loops, options.num_threads), map.n_res);
+  // Loops are independent: each worker fills its own per-loop slot, and the
+  // slots are concatenated in loop order afterwards.
+  std::vector<std::vector<Surface>> loop_surfaces(loops.size());
+  ParallelFor(n_loops, options.num_threads, [&](int i, int worker) {
+    BuildLoopSurfaces(loops[i], map, options, &arena->workers[worker],
+                      &loop_surfaces[i]);
+  });
+
+  std::vector<Surface> surfaces;
+  size_t total = 0;
+  for (const auto &group : loop_surfaces) {
+    total += group.size();
+  }
+  surfaces.reserve(total);
+  for (auto &group : loop_surfaces) {
+    for (auto &surface : group) {
       surfaces.push_back(std::move(surface));
     }
   }
@@ -8,6 +8,18 @@ namespace rna {
 
 std::vector<Surface> BuildSurfaces(const std::vector<ResidueCoord> &coords,
                                    const std::vector<Loop> &loops,
-                                   const SurfaceBuildOptions &options);
+                                   const SurfaceBuildOptions &options,
+                                   ScratchArena *arena);
+
+struct CoordMap;
+struct WorkerScratch;
+
+// Append the surface(s) of one loop to *out (several for a split multiloop).
+// `scratch->mask` must hold map.n_res + 1 zero flags; it is left that way.
+void BuildLoopSurfaces(const Loop &loop,
+                       const CoordMap &map,
+                       const SurfaceBuildOptions &options,
+                       WorkerScratch *scratch,
+                       std::vector<Surface> *out);
 
 }  // namespace rna
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from functools import singledispatch
+from typing import Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@singledispatch
+def unique_residues(pairs: Iterable[Tuple[int, int]]) -> List[int]:
+    """Sorted unique residue indices from (i, j) pairs or an (n, 2) array."""
+    return sorted({idx for pair in pairs for idx in pair})
+
+
+@unique_residues.register
+def _(pairs: np.ndarray) -> List[int]:
+    return np.unique(pairs.reshape(-1)).tolist()
+
+
+def build_resi_string(residues: Sequence[int]) -> str:
+    """Format sorted unique residue indices as a PyMOL resi list, e.g. "1-5+7"."""
+    residues = np.asarray(residues, dtype=np.int64)
+    if residues.size == 0:
+        return ""
+    breaks = np.flatnonzero(np.diff(residues) != 1) + 1
+    starts = residues[np.concatenate(([0], breaks))].tolist()
+    ends = residues[np.concatenate((breaks - 1, [residues.size - 1]))].tolist()
+    return "+".join(
+        str(start) if start == end else f"{start}-{end}" for start, end in zip(starts, ends)
+    )
+
+
+def selection_from_residues(
+    residues: Sequence[int],
+    chain_id: Optional[str] = None,
+    nucleic_only: bool = False,
+) -> str:
+    terms = ["polymer.nucleic"] if nucleic_only else []
+    if chain_id:
+        terms.append(f"chain {chain_id}")
+    terms.append(f"resi {build_resi_string(residues)}")
+    if len(terms) == 1:
+        return terms[0]
+    return f"({' and '.join(terms)})"
+
+
+# Indexed by int(AtomKind): SINGLE, P, C4.
+ATOM_LABEL = ("X", "P", "C4'")
+
+
+def endpoint_label_table(res_ids: Mapping[int, str]) -> List[str]:
+    """Flat table[res_index * 3 + int(atom_kind)] -> "<res id>:<atom>" label.
+
+    Unmapped residue indices fall back to the number itself.
+    """
+    n_slots = max(res_ids, default=0) + 1
+    return [
+        f"{res_ids.get(res_index, str(res_index))}:{atom}"
+        for res_index in range(n_slots)
+        for atom in ATOM_LABEL
+    ]
@@ -1,9 +1,36 @@
 from __future__ import annotations
 
+import hashlib
+import os
+import re
+import zipfile
 from dataclasses import dataclass
-from typing import Iterable, List, Optional, Sequence, Set, Tuple
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from Bio.PDB import MMCIFParser, PDBParser
+import numpy as np
+from Bio.PDB import FastMMCIFParser, MMCIFParser, PDBParser
+
+from secstruct2bpseq import (
+    UNSUPPORTED_CODE,
+    bracket_codes,
+    build_bracket_table,
+    pair_brackets,
+)
+
+if TYPE_CHECKING:
+    import rnaknotdetector_core as core
 
 
 @dataclass
@@ -13,6 +40,14 @@ class ResidueCoord:
     pdb_res_id: str
 
 
+@dataclass
+class CoordArrays:
+    # Same content as List[ResidueCoord], one row per residue.
+    res_index: np.ndarray  # (R,) int32, 1-based
+    atoms: np.ndarray  # (R, A, 3) float64, NaN for missing atoms
+    pdb_res_ids: List[str]
+
+
 @dataclass
 class BasePair:
     i: int
@@ -20,6 +55,20 @@ class BasePair:
     bp_type: Optional[str] = None
 
 
+@dataclass
+class _AtomTable:
+    # One entry per ATOM/HETATM record, in file order.
+    model: np.ndarray  # model ordinal (0-based), int64
+    hetatm: np.ndarray  # bool
+    resname: np.ndarray  # str
+    chain: np.ndarray  # str
+    resseq: np.ndarray  # int64
+    icode: np.ndarray  # str, " " when blank
+    name: np.ndarray  # str
+    occupancy: np.ndarray  # float64
+    xyz: np.ndarray  # (N, 3) float64
+
+
 def load_coords(
     path: str,
     atom_names: Sequence[str] = ("C4'",),
@@ -27,10 +76,45 @@ def load_coords(
     model_index: int = 0,
     missing_policy: str = "skip",
     include_hetero: bool = False,
-) -> List[ResidueCoord]:
-    parser = _select_parser(path)
+    use_cache: bool = True,
+    fast: bool = True,
+    backend: str = "python",
+) -> Union[List[ResidueCoord], core.ResidueCoordArray]:
+    """Load per-residue coordinates of the requested atoms from a PDB/mmCIF file.
+
+    backend="python" returns ResidueCoord dataclasses; backend="cpp" returns a
+    core.ResidueCoordArray built in one call from load_coord_arrays, without
+    the dataclass intermediate (use load_coord_arrays if pdb ids are needed).
+    """
+    if backend == "cpp":
+        import rnaknotdetector_core as core
+
+        arrays = load_coord_arrays(
+            path,
+            atom_names=atom_names,
+            chain_id=chain_id,
+            model_index=model_index,
+            missing_policy=missing_policy,
+            include_hetero=include_hetero,
+            use_cache=use_cache,
+            fast=fast,
+        )
+        return core.residue_coords_from_numpy(arrays.res_index, arrays.atoms)
+    if backend != "python":
+        raise ValueError(f"Unsupported backend: {backend}")
+
+    cache_path = None
+    if use_cache:
+        cache_path = _coords_cache_path(
+            path, atom_names, chain_id, model_index, missing_policy, include_hetero, fast
+        )
+        cached = _read_coords_cache(cache_path)
+        if cached is not None:
+            return cached
+
+    parser = _select_parser(path, fast=fast)
     structure = parser.get_structure("rna", path)
-    return load_coords_from_structure(
+    coords = load_coords_from_structure(
         structure,
         atom_names=atom_names,
         chain_id=chain_id,
@@ -38,6 +122,93 @@ def load_coords(
         missing_policy=missing_policy,
         include_hetero=include_hetero,
     )
+    if cache_path is not None:
+        _write_coords_cache(cache_path, coords_to_arrays(coords, len(atom_names)))
+    return coords
+
+
+def load_coord_arrays(
+    path: str,
+    atom_names: Sequence[str] = ("C4'",),
+    chain_id: Optional[str] = None,
+    model_index: int = 0,
+    missing_policy: str = "skip",
+    include_hetero: bool = False,
+    use_cache: bool = True,
+    fast: bool = True,
+) -> CoordArrays:
+    """load_coords as contiguous arrays, ready for core.residue_coords_from_numpy."""
+    cache_path = None
+    if use_cache:
+        cache_path = _coords_cache_path(
+            path, atom_names, chain_id, model_index, missing_policy, include_hetero, fast
+        )
+        cached = _read_coords_cache_arrays(cache_path)
+        if cached is not None:
+            return cached
+
+    structure = _select_parser(path, fast=fast).get_structure("rna", path)
+    rows = list(
+        _iter_residue_rows(
+            structure,
+            atom_names=atom_names,
+            chain_id=chain_id,
+            model_index=model_index,
+            missing_policy=missing_policy,
+            include_hetero=include_hetero,
+        )
+    )
+    arrays = CoordArrays(
+        res_index=np.arange(1, len(rows) + 1, dtype=np.int32),
+        atoms=np.array([atoms for atoms, _ in rows], dtype=np.float64).reshape(
+            len(rows), len(atom_names), 3
+        ),
+        pdb_res_ids=[res_id for _, res_id in rows],
+    )
+    if cache_path is not None:
+        _write_coords_cache(cache_path, arrays)
+    return arrays
+
+
+def coords_to_arrays(coords: Sequence[ResidueCoord], n_atoms: int) -> CoordArrays:
+    atoms = np.array([res.atoms for res in coords], dtype=np.float64).reshape(
+        len(coords), n_atoms, 3
+    )
+    return CoordArrays(
+        res_index=np.array([res.res_index for res in coords], dtype=np.int32),
+        atoms=atoms,
+        pdb_res_ids=[res.pdb_res_id for res in coords],
+    )
+
+
+def load_coords_np(
+    path: str,
+    atom_names: Sequence[str] = ("C4'",),
+    chain_id: Optional[str] = None,
+    model_index: int = 0,
+    missing_policy: str = "skip",
+    include_hetero: bool = False,
+) -> List[ResidueCoord]:
+    """Same result as load_coords, without building a Biopython structure.
+
+    Atom records are read straight into NumPy columns (fixed-width columns for
+    PDB, the _atom_site loop for mmCIF) and grouped into residues vectorially.
+    Residue/atom conventions follow Biopython's parsers: auth chain and residue
+    ids for mmCIF, highest-occupancy altloc, float32 coordinates.
+    """
+    lower = path.lower()
+    if lower.endswith(".cif") or lower.endswith(".mmcif"):
+        table = _read_cif_atom_table(path)
+    else:
+        table = _read_pdb_atom_table(path)
+    return _coords_from_atom_table(
+        table,
+        atom_names=atom_names,
+        chain_id=chain_id,
+        model_index=model_index,
+        missing_policy=missing_policy,
+        include_hetero=include_hetero,
+    )
 
 
 def load_coords_from_structure(
@@ -48,11 +219,31 @@ def load_coords_from_structure(
     missing_policy: str = "skip",
     include_hetero: bool = False,
 ) -> List[ResidueCoord]:
+    rows = _iter_residue_rows(
+        structure,
+        atom_names=atom_names,
+        chain_id=chain_id,
+        model_index=model_index,
+        missing_policy=missing_policy,
+        include_hetero=include_hetero,
+    )
+    return [
+        ResidueCoord(seq_index, atom_coords, pdb_res_id)
+        for seq_index, (atom_coords, pdb_res_id) in enumerate(rows, start=1)
+    ]
+
+
+def _iter_residue_rows(
+    structure,
+    atom_names: Sequence[str],
+    chain_id: Optional[str],
+    model_index: int,
+    missing_policy: str,
+    include_hetero: bool,
+) -> Iterator[Tuple[List[Tuple[float, float, float]], str]]:
+    # (atom coords, pdb residue id) for each kept residue, in chain order.
     model = structure[model_index]
     chain = _select_chain(model, chain_id=chain_id)
-    coords: List[ResidueCoord] = []
-    seq_index = 1
-
     for residue in chain.get_residues():
         if _should_skip_residue(residue, include_hetero=include_hetero):
             continue
@@ -61,31 +252,22 @@ def load_coords_from_structure(
         )
         if atom_coords is None:
             continue
-        pdb_res_id = _format_residue_id(chain.id, residue.get_id())
-        coords.append(ResidueCoord(seq_index, atom_coords, pdb_res_id))
-        seq_index += 1
-
-    return coords
+        yield atom_coords, _format_residue_id(chain.id, residue.get_id())
 
 
 def parse_dot_bracket(dot_bracket: str) -> List[BasePair]:
-    stack: List[int] = []
-    pairs: List[BasePair] = []
-    for idx, char in enumerate(dot_bracket, start=1):
-        if char == "(":
-            stack.append(idx)
-        elif char == ")":
-            if not stack:
-                raise ValueError("Unbalanced dot-bracket: too many closing parens")
-            i = stack.pop()
-            pairs.append(BasePair(i=i, j=idx))
-        elif char == ".":
-            continue
-        else:
-            raise ValueError(f"Unsupported dot-bracket symbol: {char}")
-    if stack:
+    codes = bracket_codes(dot_bracket, _DOT_BRACKET_TABLE)
+    depth = np.cumsum(codes, dtype=np.int64)
+    unsupported = np.flatnonzero(codes == UNSUPPORTED_CODE)
+    unexpected = np.flatnonzero(depth < 0)
+    if unsupported.size and (not unexpected.size or unsupported[0] < unexpected[0]):
+        raise ValueError(f"Unsupported dot-bracket symbol: {dot_bracket[unsupported[0]]}")
+    if unexpected.size:
+        raise ValueError("Unbalanced dot-bracket: too many closing parens")
+    if depth.size and depth[-1] > 0:
         raise ValueError("Unbalanced dot-bracket: too many opening parens")
-    return pairs
+    pairs = pair_brackets(codes) + 1
+    return [BasePair(i=i, j=j) for i, j in pairs.tolist()]
 
 
 def parse_bpseq(lines: Iterable[str]) -> List[BasePair]:
@@ -104,11 +286,326 @@ def parse_bpseq(lines: Iterable[str]) -> List[BasePair]:
     return pairs
 
 
-def _select_parser(path: str):
+# Fixed-width PDB columns (0-based offsets) viewed directly on an 80-byte record.
+_PDB_RECORD = np.dtype(
+    {
+        "names": [
+            "record",
+            "name",
+            "altloc",
+            "resname",
+            "chain",
+            "resseq",
+            "icode",
+            "x",
+            "y",
+            "z",
+            "occupancy",
+        ],
+        "formats": ["S6", "S4", "S1", "S3", "S1", "S4", "S1", "S8", "S8", "S8", "S6"],
+        "offsets": [0, 12, 16, 17, 21, 22, 26, 30, 38, 46, 54],
+        "itemsize": 80,
+    }
+)
+
+_CIF_TOKEN = re.compile(r"""'(.*?)'(?=\s|$)|"(.*?)"(?=\s|$)|(\S+)""")
+_CIF_UNASSIGNED = (".", "?")
+
+
+def _read_pdb_atom_table(path: str) -> _AtomTable:
+    with open(path, "rb") as handle:
+        lines = handle.read().splitlines()
+    records = np.array(lines, dtype="S80").view(_PDB_RECORD)
+    kind = records["record"]
+    # Like PDBParser, atomic data ends at the first END/CONECT record.
+    end = np.flatnonzero((kind == b"END   ") | (kind == b"CONECT"))
+    if end.size:
+        records = records[: end[0]]
+        kind = kind[: end[0]]
+
+    is_atom = (kind == b"ATOM  ") | (kind == b"HETATM")
+    # A model starts at each MODEL record, or at the first atom after ENDMDL
+    # (or at the start of the file) when no MODEL record opened one.
+    is_model = kind == b"MODEL "
+    control = np.flatnonzero(is_model | (kind == b"ENDMDL"))
+    last_control = np.full(len(kind), -1, dtype=np.int64)
+    last_control[control] = control
+    last_control = np.maximum.accumulate(last_control)
+    atom_rows = np.flatnonzero(is_atom)
+    _, first_atoms = np.unique(last_control[atom_rows], return_index=True)
+    opens = np.zeros(len(kind), dtype=bool)
+    opens[is_model] = True
+    implicit = atom_rows[first_atoms]
+    implicit = implicit[(last_control[implicit] < 0) | ~is_model[last_control[implicit]]]
+    opens[implicit] = True
+    model = np.cumsum(opens)[atom_rows] - 1
+
+    atoms = records[atom_rows]
+    fullname = atoms["name"]
+    stripped = np.char.strip(fullname)
+    # Atom names with internal spaces are kept unstripped, as PDBParser does.
+    name = np.where(np.char.find(stripped, b" ") >= 0, fullname, stripped)
+    xyz = np.stack([atoms["x"], atoms["y"], atoms["z"]], axis=1).astype(np.float64)
+    occupancy = np.char.strip(atoms["occupancy"])
+    return _AtomTable(
+        model=model.astype(np.int64),
+        hetatm=atoms["record"] == b"HETATM",
+        resname=np.char.strip(atoms["resname"]).astype(str),
+        chain=atoms["chain"].astype(str),
+        resseq=atoms["resseq"].astype(np.int64),
+        icode=np.where(atoms["icode"] == b"", b" ", atoms["icode"]).astype(str),
+        name=name.astype(str),
+        occupancy=np.where(occupancy == b"", b"0", occupancy).astype(np.float64),
+        xyz=xyz,
+    )
+
+
+def _split_cif_row(line: str) -> List[str]:
+    if '"' in line or "'" in line:
+        return [
+            single or double or bare
+            for single, double, bare in _CIF_TOKEN.findall(line)
+        ]
+    return line.split()
+
+
+def _read_cif_atom_site(path: str) -> Dict[str, np.ndarray]:
+    columns: List[str] = []
+    tokens: List[str] = []
+    in_loop = False
+    reading = False
+    with open(path, "r", encoding="utf-8") as handle:
+        for raw in handle:
+            line = raw.strip()
+            if reading:
+                if line.startswith(("_", "loop_", "#", "data_")):
+                    break
+                tokens.extend(_split_cif_row(line))
+                continue
+            if line == "loop_":
+                in_loop = True
+                columns = []
+                continue
+            if in_loop and line.startswith("_atom_site."):
+                columns.append(line.split()[0][len("_atom_site."):])
+                continue
+            if columns:
+                reading = True
+                tokens.extend(_split_cif_row(line))
+                continue
+            in_loop = False
+    if not columns:
+        raise ValueError(f"No _atom_site loop found in {path}")
+    values = np.array(tokens, dtype=str).reshape(-1, len(columns))
+    return {column: values[:, k] for k, column in enumerate(columns)}
+
+
+def _read_cif_atom_table(path: str) -> _AtomTable:
+    site = _read_cif_atom_site(path)
+    resseq = site["auth_seq_id"] if "auth_seq_id" in site else site["label_seq_id"]
+    # Records without a residue number are dropped by MMCIFParser as well.
+    rows = resseq != "."
+    site = {column: values[rows] for column, values in site.items()}
+    resseq = resseq[rows]
+
+    if "pdbx_PDB_model_num" in site:
+        serial = site["pdbx_PDB_model_num"].astype(np.int64)
+        starts = np.concatenate(([True], serial[1:] != serial[:-1]))
+        model = np.cumsum(starts) - 1
+    else:
+        model = np.zeros(len(resseq), dtype=np.int64)
+    icode = site["pdbx_PDB_ins_code"]
+    xyz = np.stack(
+        [site["Cartn_x"], site["Cartn_y"], site["Cartn_z"]], axis=1
+    ).astype(np.float64)
+    return _AtomTable(
+        model=model,
+        hetatm=site["group_PDB"] == "HETATM",
+        resname=site["label_comp_id"],
+        chain=site["auth_asym_id"],
+        resseq=resseq.astype(np.int64),
+        icode=np.where(np.isin(icode, _CIF_UNASSIGNED), " ", icode),
+        name=site["label_atom_id"],
+        occupancy=site["occupancy"].astype(np.float64),
+        xyz=xyz,
+    )
+
+
+def _coords_from_atom_table(
+    table: _AtomTable,
+    atom_names: Sequence[str],
+    chain_id: Optional[str],
+    model_index: int,
+    missing_policy: str,
+    include_hetero: bool,
+) -> List[ResidueCoord]:
+    in_model = table.model == model_index
+    if not in_model.any():
+        raise KeyError(model_index)
+    chains, first = np.unique(table.chain[in_model], return_index=True)
+    chains = chains[np.argsort(first)].tolist()
+    if chain_id is None:
+        if len(chains) != 1:
+            raise ValueError("chain_id is required when multiple chains are present")
+        chain_id = chains[0]
+    elif chain_id not in chains:
+        raise ValueError(f"chain_id not found: {chain_id}")
+
+    rows = np.flatnonzero(in_model & (table.chain == chain_id))
+    resname = table.resname[rows]
+    is_water = (resname == "HOH") | (resname == "WAT")
+    hetflag = np.where(
+        table.hetatm[rows], np.where(is_water, "W", np.char.add("H_", resname)), " "
+    )
+    resseq = table.resseq[rows]
+    icode = table.icode[rows]
+
+    # Residues in order of first appearance, as Biopython's chain iteration.
+    keys = np.stack([hetflag, resseq.astype(str), icode], axis=1)
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    res_of_atom = rank[inverse.reshape(-1)]
+    res_first = first[order]
+
+    res_het = hetflag[res_first]
+    res_name = np.char.upper(resname[res_first])
+    keep = np.isin(res_name, list(_RNA_RESIDUES)) & ~np.isin(res_name, list(_WATER_RESIDUES))
+    if not include_hetero:
+        keep &= res_het == " "
+
+    n_res = len(order)
+    atoms = np.full((n_res, len(atom_names), 3), np.nan)
+    present = np.zeros((n_res, len(atom_names)), dtype=bool)
+    names = table.name[rows]
+    occupancy = table.occupancy[rows]
+    # Biopython coordinates are float32; round through it to match load_coords.
+    xyz = table.xyz[rows].astype(np.float32).astype(np.float64)
+    for k, name in enumerate(atom_names):
+        sel = np.flatnonzero(names == name)
+        if not sel.size:
+            continue
+        # Highest occupancy wins (first one on ties), like DisorderedAtom.
+        sel = sel[np.lexsort((sel, -occupancy[sel], res_of_atom[sel]))]
+        res = res_of_atom[sel]
+        head = np.concatenate(([True], res[1:] != res[:-1]))
+        atoms[res[head], k] = xyz[sel[head]]
+        present[res[head], k] = True
+
+    complete = present.all(axis=1)
+    if missing_policy == "skip":
+        keep &= complete
+    elif missing_policy != "nan":
+        missing = np.flatnonzero(keep & ~complete)
+        if missing.size:
+            r = missing[0]
+            name = atom_names[int(np.argmin(present[r]))]
+            res_id = (str(res_het[r]), int(resseq[res_first[r]]), str(icode[res_first[r]]))
+            raise ValueError(f"Missing atom {name} in residue {res_id}")
+
+    kept = np.flatnonzero(keep)
+    res_ids = [
+        _format_residue_id(chain_id, (het, seq, ins))
+        for het, seq, ins in zip(
+            res_het[kept].tolist(),
+            resseq[res_first[kept]].tolist(),
+            icode[res_first[kept]].tolist(),
+        )
+    ]
+    return [
+        ResidueCoord(idx, [tuple(atom) for atom in res_atoms], res_id)
+        for idx, (res_atoms, res_id) in enumerate(
+            zip(atoms[kept].tolist(), res_ids), start=1
+        )
+    ]
+
+
+# Part of every coordinate cache key. Bump it whenever extraction semantics
+# change (_RNA_RESIDUES, _should_skip_residue, altloc/missing-atom handling)
+# so entries written by older code are not returned.
+_COORDS_CACHE_VERSION = 1
+
+
+def _coords_cache_dir() -> Path:
+    env_dir = os.environ.get("RNAKNOT_CACHE_DIR")
+    if env_dir:
+        return Path(env_dir)
+    return Path.home() / ".cache" / "rnaknotdetector"
+
+
+def _coords_cache_path(
+    path: str,
+    atom_names: Sequence[str],
+    chain_id: Optional[str],
+    model_index: int,
+    missing_policy: str,
+    include_hetero: bool,
+    fast: bool,
+) -> Path:
+    stat = os.stat(path)
+    key = (
+        f"v{_COORDS_CACHE_VERSION}:"
+        f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}:"
+        f"{tuple(atom_names)}:{chain_id}:{model_index}:{missing_policy}:{include_hetero}:"
+        f"{fast}"
+    )
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return _coords_cache_dir() / f"{digest}.npz"
+
+
+def _read_coords_cache(cache_path: Path) -> Optional[List[ResidueCoord]]:
+    arrays = _read_coords_cache_arrays(cache_path)
+    if arrays is None:
+        return None
+    return [
+        ResidueCoord(idx, [tuple(atom) for atom in res_atoms], res_id)
+        for idx, res_atoms, res_id in zip(
+            arrays.res_index.tolist(), arrays.atoms.tolist(), arrays.pdb_res_ids
+        )
+    ]
+
+
+def _read_coords_cache_arrays(cache_path: Path) -> Optional[CoordArrays]:
+    # Any unreadable entry is treated as a miss and rebuilt from the structure;
+    # a damaged one (e.g. truncated .npz) is removed first.
+    try:
+        with np.load(cache_path) as data:
+            atoms = data["atoms"]
+            res_ids = data["res_ids"].tolist()
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        try:
+            cache_path.unlink()
+        except OSError:
+            pass
+        return None
+    res_index = np.arange(1, len(res_ids) + 1, dtype=np.int32)
+    return CoordArrays(res_index=res_index, atoms=atoms, pdb_res_ids=res_ids)
+
+
+def _write_coords_cache(cache_path: Path, arrays: CoordArrays) -> None:
+    res_ids = np.array(arrays.pdb_res_ids, dtype=str)
+    tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as handle:
+            np.savez(handle, atoms=arrays.atoms, res_ids=res_ids)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _select_parser(path: str, fast: bool = True):
+    # FastMMCIFParser only tokenizes _atom_site, which is all load_coords needs.
     lower = path.lower()
     if lower.endswith(".cif") or lower.endswith(".mmcif"):
-        return MMCIFParser(QUIET=True)
-    return PDBParser(QUIET=True)
+        return _FAST_MMCIF_PARSER if fast else _MMCIF_PARSER
+    return _PDB_PARSER
 
 
 def _select_chain(model, chain_id: Optional[str]):
@@ -128,7 +625,9 @@ def _should_skip_residue(residue, include_hetero: bool) -> bool:
     if not include_hetero and hetflag != " ":
         return True
     resname = residue.get_resname().upper()
-    if resname in {"HOH", "WAT"}:
+    if resname in _RNA_COMMON:
+        return False
+    if resname in _WATER_RESIDUES:
         return True
     if not _is_rna_residue(resname):
         return True
@@ -136,18 +635,20 @@ def _should_skip_residue(residue, include_hetero: bool) -> bool:
 
 
 def _extract_atoms(residue, atom_names: Sequence[str], missing_policy: str):
+    # child_dict maps atom name -> Atom (or DisorderedAtom); one probe per name.
+    atoms_by_name = residue.child_dict
     coords: List[Tuple[float, float, float]] = []
     for name in atom_names:
-        if name not in residue:
+        atom = atoms_by_name.get(name)
+        if atom is None:
             if missing_policy == "skip":
                 return None
             if missing_policy == "nan":
-                coords.append((float("nan"), float("nan"), float("nan")))
+                coords.append(_NAN_COORD)
                 continue
             raise ValueError(f"Missing atom {name} in residue {residue.get_id()}")
-        atom = residue[name]
         x, y, z = atom.get_coord().tolist()
-        coords.append((float(x), float(y), float(z)))
+        coords.append((x, y, z))
     return coords
 
 
@@ -160,15 +661,23 @@ def _format_residue_id(chain_id: str, res_id) -> str:
 
 
 def _is_rna_residue(resname: str) -> bool:
-    return resname in _RNA_RESIDUES
+    # resname is expected upper-cased already (see _should_skip_residue).
+    return resname in _RNA_COMMON or resname in _RNA_RESIDUES
+
+
+_NAN_COORD = (float("nan"), float("nan"), float("nan"))
+
+_PDB_PARSER = PDBParser(QUIET=True)
+_MMCIF_PARSER = MMCIFParser(QUIET=True)
+_FAST_MMCIF_PARSER = FastMMCIFParser(QUIET=True)
+
+_DOT_BRACKET_TABLE = build_bracket_table({"(": ")"}, ".")
 
+# Standard one-letter names cover nearly every residue; checked first.
+_RNA_COMMON: FrozenSet[str] = frozenset({"A", "C", "G", "U", "I"})
+_WATER_RESIDUES: FrozenSet[str] = frozenset({"HOH", "WAT"})
 
-_RNA_RESIDUES: Set[str] = {
-    "A",
-    "C",
-    "G",
-    "U",
-    "I",
+_RNA_RESIDUES: FrozenSet[str] = _RNA_COMMON | frozenset({
     "URA",
     "URA3",
     "ADE",
@@ -191,4 +700,4 @@ _RNA_RESIDUES: Set[str] = {
     "C23",
     "G23",
     "U23",
-}
+})
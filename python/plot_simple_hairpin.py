@@ -4,24 +4,36 @@ import argparse
 from typing import List, Tuple
 
 import matplotlib.pyplot as plt
+import numpy as np
+
+
+# Fixed-width PDB columns (0-based offsets) viewed directly on an 80-byte record.
+_PDB_RECORD = np.dtype(
+    {
+        "names": ["record", "atom_name", "res_id", "x", "y", "z"],
+        "formats": ["S4", "S4", "S4", "S8", "S8", "S8"],
+        "offsets": [0, 12, 22, 30, 38, 46],
+        "itemsize": 80,
+    }
+)
 
 
 def load_c4_coords(path: str) -> List[Tuple[int, float, float, float]]:
-    coords: List[Tuple[int, float, float, float]] = []
-    with open(path, "r", encoding="utf-8") as handle:
-        for line in handle:
-            if not line.startswith("ATOM"):
-                continue
-            atom_name = line[12:16].strip()
-            if atom_name != "C4'":
-                continue
-            res_id = int(line[22:26])
-            x = float(line[30:38])
-            y = float(line[38:46])
-            z = float(line[46:54])
-            coords.append((res_id, x, y, z))
-    coords.sort(key=lambda t: t[0])
-    return coords
+    with open(path, "rb") as handle:
+        lines = np.array(handle.read().splitlines(), dtype="S80")
+    if lines.size == 0:
+        return []
+    records = lines.view(_PDB_RECORD)
+    mask = (records["record"] == b"ATOM") & (
+        np.char.strip(records["atom_name"]) == b"C4'"
+    )
+    atoms = records[mask]
+    res_ids = atoms["res_id"].astype(np.int64)
+    order = np.argsort(res_ids, kind="stable")
+    xs = atoms["x"].astype(np.float64)[order]
+    ys = atoms["y"].astype(np.float64)[order]
+    zs = atoms["z"].astype(np.float64)[order]
+    return list(zip(res_ids[order].tolist(), xs.tolist(), ys.tolist(), zs.tolist()))
 
 
 def main() -> int:
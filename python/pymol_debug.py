@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Optional, Sequence, Tuple
+from typing import List, Optional, Sequence, Tuple
 
 from pymol import cmd
 
 import rnaknotdetector_core as core
 
-from secstruct2bpseq import parse_secstruct, read_secstruct_file
+from _pymol_common import selection_from_residues, unique_residues
+from secstruct2bpseq import parse_secstruct_pairs, read_secstruct_file
 
 
 def print_main_layer_pairs(
@@ -20,15 +21,14 @@ def print_main_layer_pairs(
     cmd_handle = cmd_obj or cmd
     if cmd_handle is None:
         raise RuntimeError("pymol.cmd is not available")
-    if read_secstruct_file is None or parse_secstruct is None:
+    if read_secstruct_file is None or parse_secstruct_pairs is None:
         raise RuntimeError("secstruct2bpseq helpers are not available")
 
     if secstruct_path is None:
         secstruct_path = f"{model_name}.secstruct"
 
     sequence, secstruct = read_secstruct_file(secstruct_path)
-    pair_map = parse_secstruct(secstruct)
-    bp_list = [(i, j) for i, j in enumerate(pair_map) if i > 0 and j > i]
+    bp_list = parse_secstruct_pairs(secstruct)
     main_pairs = core.get_main_layer_pairs(bp_list)
 
     residues = _extract_residues(cmd_handle, model_name, chain_id)
@@ -48,38 +48,25 @@ def color_main_layer_pairs(
     cmd_handle = cmd_obj or cmd
     if cmd_handle is None:
         raise RuntimeError("pymol.cmd is not available")
-    if read_secstruct_file is None or parse_secstruct is None:
+    if read_secstruct_file is None or parse_secstruct_pairs is None:
         raise RuntimeError("secstruct2bpseq helpers are not available")
 
     if secstruct_path is None:
         secstruct_path = f"{model_name}.secstruct"
 
     _, secstruct = read_secstruct_file(secstruct_path)
-    pair_map = parse_secstruct(secstruct)
-    bp_list = [(i, j) for i, j in enumerate(pair_map) if i > 0 and j > i]
+    bp_list = parse_secstruct_pairs(secstruct)
     main_pairs = core.get_main_layer_pairs(bp_list)
 
-    residues = _unique_residues_from_pairs(main_pairs)
+    residues = unique_residues(main_pairs)
     if not residues:
         return []
 
-    selection = _selection_from_residues(residues, chain_id=chain_id)
+    selection = selection_from_residues(residues, chain_id=chain_id)
     cmd_handle.color(color, f"({model_name} and {selection})")
     return residues
 
 
-def _unique_residues_from_pairs(pairs: Iterable[Tuple[int, int]]) -> List[int]:
-    residues = {idx for pair in pairs for idx in pair}
-    return sorted(residues)
-
-
-def _selection_from_residues(residues: Sequence[int], chain_id: Optional[str]) -> str:
-    resi = "+".join(str(idx) for idx in residues)
-    if chain_id:
-        return f"(chain {chain_id} and resi {resi})"
-    return f"resi {resi}"
-
-
 def _extract_residues(cmd_handle, model_name: str, chain_id: str) -> List[str]:
     model = cmd_handle.get_model(f"{model_name} and chain {chain_id}")
     seen = set()
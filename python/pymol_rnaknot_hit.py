@@ -1,20 +1,30 @@
 from __future__ import annotations
 
-import math
 from dataclasses import dataclass
 from pathlib import Path
 import os
 import sys
 import tempfile
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 from pymol import cmd
 from pymol.cgo import BEGIN, COLOR, CYLINDER, END, SPHERE, TRIANGLES, VERTEX
 
 import rnaknotdetector_core as core
 
+from _pymol_common import ATOM_LABEL, endpoint_label_table, selection_from_residues
 from input_layer import parse_bpseq
-from secstruct2bpseq import parse_secstruct, read_secstruct_file
+from secstruct2bpseq import parse_secstruct_pairs, read_secstruct_file
+
+
+# Per-hit CGO: COLOR + SPHERE + COLOR before the surface, COLOR + CYLINDER after.
+_CGO_HIT_HEAD_LEN = 4 + 5 + 4
+_CGO_HIT_TAIL_LEN = 4 + 14
+
+# (model_name, requested chain, state) ->
+#     (selection, object atom count, get_coords snapshot, extracted coords).
+_COORD_CACHE: Dict[Tuple[str, str, int], Tuple[str, int, np.ndarray, tuple]] = {}
 
 
 @dataclass(frozen=True)
@@ -25,6 +35,14 @@ class ResidueKey:
     segi: str
 
 
+@dataclass(frozen=True)
+class SurfaceArrays:
+    triangles: np.ndarray  # (n, 3, 3) triangle vertices
+    tri_min: np.ndarray  # (n, 3) per-triangle bounding box
+    tri_max: np.ndarray  # (n, 3)
+    polygon: np.ndarray  # (m, 3) polygon vertices lifted onto the plane; empty if invalid
+
+
 def _apply_pymol_qt_compat_patch() -> None:
     try:
         from pmg_qt import pymol_gl_widget
@@ -96,18 +114,27 @@ def rnaknot_hit(
     eps_plane: float = 1e-2,
     eps_polygon: float = 1e-2,
     eps_collinear: float = 1e-6,
+    split_hits: bool = False,
     cmd_obj=None,
 ) -> List[int]:
     """Detect entanglement hits on the RNA part of a PyMOL object.
 
     If no chain is given and the object contains exactly one nucleic-acid chain,
-    that chain is used automatically.
+    that chain is used automatically. All hits go into one `<model>_hits`
+    selection and one `<model>_hits_geom` CGO object; pass split_hits=True to
+    also get per-hit `<model>_hit_<n>` selections and CGO objects.
+
+    Coordinates are read from the current state and cached per object, chain
+    and state; the cache is reused while the object's atom count and nucleic
+    coordinates are unchanged. Run `rnaknot_clear_cache` after edits that keep
+    both (e.g. `alter` on chain/resi/name, or reloading an identical object).
     """
     cmd_handle = cmd_obj or cmd
     if cmd_handle is None:
         raise RuntimeError("pymol.cmd is not available")
+    split_hits = _as_bool(split_hits)
 
-    coords_cpp, res_id_map, atom_map, resolved_chain = _extract_coords_from_pymol(
+    coords_cpp, res_id_map, atom_coords, resolved_chain = _extract_coords_cached(
         cmd_handle, model_name, chain
     )
     if not coords_cpp:
@@ -139,7 +166,12 @@ def rnaknot_hit(
 
     loop_map = {loop.id: loop for loop in loops}
     surface_map = {surface.loop_id: surface for surface in surfaces}
+    surface_arrays_map: Dict[int, SurfaceArrays] = {}
     hit_indices: List[int] = []
+    hit_selections: List[str] = []
+    merged_cgo: List[float] = []
+    label_table = endpoint_label_table(res_id_map)
+    n_kinds = len(ATOM_LABEL)
 
     for idx, hit in enumerate(result.hits, start=1):
         loop = loop_map.get(hit.loop_id)
@@ -151,38 +183,62 @@ def rnaknot_hit(
         hit_indices.append(idx)
         loop_type = _format_loop_type(loop)
         closing_pairs = [(bp.i, bp.j) for bp in loop.closing_pairs]
-        a_label = _format_endpoint(res_id_map, hit.res_a, hit.atom_a)
-        b_label = _format_endpoint(res_id_map, hit.res_b, hit.atom_b)
+        a_label = label_table[hit.res_a * n_kinds + int(hit.atom_a)]
+        b_label = label_table[hit.res_b * n_kinds + int(hit.atom_b)]
         print(
             f"hit loop={hit.loop_id} type={loop_type} "
             f"pairs={closing_pairs} segment=({a_label},{b_label})"
         )
-        selection_name = f"{model_name}_hit_{idx}"
-        selection = _build_hit_selection(loop, hit, resolved_chain)
-        cmd_handle.select(selection_name, f"({model_name} and {selection})")
-        tri_count = len(surface.triangles) if surface.triangles is not None else 0
+        selection = f"({model_name} and {_build_hit_selection(loop, hit, resolved_chain)})"
+        hit_selections.append(selection)
+        if split_hits:
+            cmd_handle.select(f"{model_name}_hit_{idx}", selection)
+        surface_arrays = surface_arrays_map.get(hit.loop_id)
+        if surface_arrays is None:
+            surface_arrays = _pack_surface(surface)
+            surface_arrays_map[hit.loop_id] = surface_arrays
+        tri_count = len(surface_arrays.triangles)
         print(f"[debug] hit={idx} loop={hit.loop_id} tri_n={tri_count}")
-        _draw_hit_objects(
-            cmd_handle,
-            model_name,
-            idx,
-            hit,
-            surface,
-            atom_map,
-        )
+        cgo = _build_hit_cgo(hit, surface_arrays, atom_coords)
+        if cgo is None:
+            continue
+        if split_hits:
+            cmd_handle.load_cgo(cgo, f"{model_name}_hit_{idx}_geom")
+        # Every per-hit CGO starts with its own COLOR, so they concatenate as-is.
+        merged_cgo.extend(cgo)
 
     if not hit_indices:
         print("no hit")
+        return hit_indices
+    cmd_handle.select(f"{model_name}_hits", " or ".join(hit_selections))
+    if merged_cgo:
+        cmd_handle.load_cgo(merged_cgo, f"{model_name}_hits_geom")
     return hit_indices
 
 
+def _as_bool(value) -> bool:
+    # PyMOL passes command arguments as strings, e.g. split_hits=0 -> "0".
+    if isinstance(value, str):
+        return value.strip().lower() not in ("", "0", "false", "no", "off")
+    return bool(value)
+
+
+def rnaknot_clear_cache(model_name: str = "") -> None:
+    """Forget cached coordinates for one object, or for all objects if omitted."""
+    model_name = model_name.strip() if model_name else ""
+    if not model_name:
+        _COORD_CACHE.clear()
+        return
+    for key in [key for key in _COORD_CACHE if key[0] == model_name]:
+        del _COORD_CACHE[key]
+
+
 def _load_base_pairs(ss_path: str) -> List[Tuple[int, int]]:
     path = Path(ss_path)
     suffix = path.suffix.lower()
     if suffix == ".secstruct":
         _, secstruct = read_secstruct_file(str(path))
-        pair_map = parse_secstruct(secstruct)
-        return [(i, j) for i, j in enumerate(pair_map) if i > 0 and j > i]
+        return parse_secstruct_pairs(secstruct)
     if suffix == ".bpseq":
         lines = path.read_text(encoding="utf-8").splitlines()
         pairs = parse_bpseq(lines)
@@ -306,43 +362,77 @@ def _parse_extended_secstruct(ss: str) -> List[Tuple[int, int]]:
     return pairs
 
 
+def _extract_coords_cached(cmd_handle, model_name: str, chain: str):
+    # get_coords is a single array copy, far cheaper than walking get_model()
+    # atoms, so together with the atom count it is the staleness check
+    # (moved, edited, atoms added/removed or reloaded).
+    state = cmd_handle.get_state()
+    key = (model_name, chain.strip() if chain else "", state)
+    n_atoms = cmd_handle.count_atoms(f"({model_name})")
+    cached = _COORD_CACHE.get(key)
+    if cached is not None:
+        selection, cached_atoms, xyz, extracted = cached
+        if cached_atoms == n_atoms:
+            current = cmd_handle.get_coords(selection, state=state)
+            if current is not None and np.array_equal(current, xyz):
+                return extracted
+        del _COORD_CACHE[key]
+    extracted = _extract_coords_from_pymol(cmd_handle, model_name, chain, state)
+    selection = _nucleic_selection(model_name, extracted[3])
+    xyz = cmd_handle.get_coords(selection, state=state)
+    if xyz is not None:
+        _COORD_CACHE[key] = (selection, n_atoms, xyz, extracted)
+    return extracted
+
+
 def _extract_coords_from_pymol(
     cmd_handle,
     model_name: str,
     chain: str,
+    state: int = 1,
 ) -> Tuple[
-    List[core.ResidueCoord],
+    core.ResidueCoordArray,
     Dict[int, str],
-    Dict[int, Dict[str, Tuple[float, float, float]]],
+    np.ndarray,
     str,
 ]:
+    """Collect P/C4' coordinates per residue.
+
+    The returned atom array has shape (n_res + 1, 2, 3) indexed by the 1-based
+    residue index, with slot 0 = P and slot 1 = C4' (NaN when missing).
+    """
     resolved_chain, selection = _resolve_nucleic_chain(cmd_handle, model_name, chain)
-    model = cmd_handle.get_model(selection)
-    residue_order: List[ResidueKey] = []
-    residue_atoms: Dict[ResidueKey, Dict[str, Tuple[float, float, float]]] = {}
+    atoms = cmd_handle.get_model(selection, state=state).atom
+    if not atoms:
+        return core.ResidueCoordArray(), {}, np.full((1, 2, 3), np.nan), resolved_chain
 
-    for atom in model.atom:
-        key = ResidueKey(atom.chain, atom.resi, atom.ins_code, atom.segi)
-        if key not in residue_atoms:
-            residue_atoms[key] = {}
-            residue_order.append(key)
-        residue_atoms[key][atom.name] = (float(atom.coord[0]), float(atom.coord[1]), float(atom.coord[2]))
+    keys = np.array(
+        [(atom.chain, atom.resi, atom.ins_code, atom.segi) for atom in atoms], dtype=str
+    )
+    names = np.array([atom.name for atom in atoms], dtype=str)
+    xyz = np.array([atom.coord for atom in atoms], dtype=np.float64).reshape(-1, 3)
 
-    coords_cpp: List[core.ResidueCoord] = []
+    # Residue index in order of first appearance (1-based), one per atom.
+    unique_keys, first, inverse = np.unique(
+        keys, axis=0, return_index=True, return_inverse=True
+    )
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(1, len(order) + 1)
+    res_of_atom = rank[inverse.reshape(-1)]
+
+    atom_coords = np.full((len(order) + 1, 2, 3), np.nan)
+    p_mask = names == "P"
+    c4_mask = names == "C4'"
+    atom_coords[res_of_atom[p_mask], 0] = xyz[p_mask]
+    atom_coords[res_of_atom[c4_mask], 1] = xyz[c4_mask]
+
+    n_res = len(order)
+    coords_cpp = core.residue_coords_from_numpy(np.arange(1, n_res + 1), atom_coords[1:])
     res_id_map: Dict[int, str] = {}
-    atom_map: Dict[int, Dict[str, Tuple[float, float, float]]] = {}
-    for idx, key in enumerate(residue_order, start=1):
-        atoms = residue_atoms.get(key, {})
-        res_id_map[idx] = _format_residue_id(key)
-        atom_map[idx] = atoms
-        p = atoms.get("P")
-        c4 = atoms.get("C4'")
-        coords = [
-            core.Vec3(*p) if p else core.Vec3(math.nan, math.nan, math.nan),
-            core.Vec3(*c4) if c4 else core.Vec3(math.nan, math.nan, math.nan),
-        ]
-        coords_cpp.append(core.ResidueCoord(idx, coords))
-    return coords_cpp, res_id_map, atom_map, resolved_chain
+    for idx, key_fields in enumerate(unique_keys[order].tolist(), start=1):
+        res_id_map[idx] = _format_residue_id(ResidueKey(*key_fields))
+    return coords_cpp, res_id_map, atom_coords, resolved_chain
 
 
 def _resolve_nucleic_chain(cmd_handle, model_name: str, chain: str) -> Tuple[str, str]:
@@ -410,90 +500,60 @@ def _format_loop_type(loop) -> str:
     return str(loop.kind)
 
 
-def _atom_kind_label(kind) -> str:
-    if kind == core.AtomKind.P:
-        return "P"
-    if kind == core.AtomKind.C4:
-        return "C4'"
-    return "X"
-
-
-def _format_endpoint(res_id_map: Dict[int, str], res_index: int, atom_kind) -> str:
-    label = res_id_map.get(res_index, str(res_index))
-    atom_label = _atom_kind_label(atom_kind)
-    return f"{label}:{atom_label}"
-
-
 def _build_hit_selection(
     loop,
     hit,
     chain: str,
 ) -> str:
-    residues = set(loop.boundary_residues)
-    for bp in loop.closing_pairs:
-        residues.add(bp.i)
-        residues.add(bp.j)
-    residues.add(hit.res_a)
-    residues.add(hit.res_b)
-    resi = "+".join(str(idx) for idx in sorted(residues))
-    if chain:
-        return f"(polymer.nucleic and chain {chain} and resi {resi})"
-    return f"(polymer.nucleic and resi {resi})"
+    closing = [idx for bp in loop.closing_pairs for idx in (bp.i, bp.j)]
+    residues = np.unique(
+        np.concatenate(
+            (
+                np.asarray(loop.boundary_residues, dtype=np.int64),
+                np.asarray(closing, dtype=np.int64),
+                np.array([hit.res_a, hit.res_b], dtype=np.int64),
+            )
+        )
+    )
+    return selection_from_residues(residues, chain, nucleic_only=True)
 
 
-def _draw_hit_objects(
-    cmd_handle,
-    model_name: str,
-    hit_index: int,
+def _build_hit_cgo(
     hit,
-    surface,
-    atom_map: Dict[int, Dict[str, Tuple[float, float, float]]],
-) -> None:
-    segment = _segment_coords(hit, atom_map)
+    surface_arrays: SurfaceArrays,
+    atom_coords: np.ndarray,
+) -> Optional[List[float]]:
+    segment = _segment_coords(hit, atom_coords)
     if segment is None:
-        return
+        return None
     seg_a, seg_b = segment
-    cgo = []
-    cgo.extend([COLOR, 1.0, 0.0, 0.0])
-    cgo.extend([SPHERE, hit.point.x, hit.point.y, hit.point.z, 0.4])
-    cgo.extend([COLOR, 0.2, 0.6, 0.2])
-    tri = _find_hit_triangle(seg_a, seg_b, surface.triangles)
+    tri = _find_hit_triangle(seg_a, seg_b, surface_arrays)
     if tri is not None:
-        cgo.extend([BEGIN, TRIANGLES])
-        cgo.extend([VERTEX, tri[0][0], tri[0][1], tri[0][2]])
-        cgo.extend([VERTEX, tri[1][0], tri[1][1], tri[1][2]])
-        cgo.extend([VERTEX, tri[2][0], tri[2][1], tri[2][2]])
-        cgo.extend([END])
+        surface_vertices = np.asarray(tri, dtype=np.float64)
     else:
-        _append_polygon_fan(cgo, surface)
-    cgo.extend([COLOR, 0.1, 0.3, 0.8])
-    cgo.extend(
-        [
-            CYLINDER,
-            seg_a[0],
-            seg_a[1],
-            seg_a[2],
-            seg_b[0],
-            seg_b[1],
-            seg_b[2],
-            0.2,
-            0.1,
-            0.3,
-            0.8,
-            0.1,
-            0.3,
-            0.8,
-        ]
-    )
-    cmd_handle.load_cgo(cgo, f"{model_name}_hit_{hit_index}_geom")
+        surface_vertices = _polygon_fan_vertices(surface_arrays.polygon)
+    surface_len = _triangles_cgo_len(len(surface_vertices))
+
+    # Fixed layout: red hit sphere, green surface triangles, blue segment.
+    cgo = np.empty(_CGO_HIT_HEAD_LEN + surface_len + _CGO_HIT_TAIL_LEN, dtype=np.float64)
+    cgo[0:4] = (COLOR, 1.0, 0.0, 0.0)
+    cgo[4:9] = (SPHERE, hit.point.x, hit.point.y, hit.point.z, 0.4)
+    cgo[9:13] = (COLOR, 0.2, 0.6, 0.2)
+    p = _CGO_HIT_HEAD_LEN
+    _write_triangles_cgo(cgo[p : p + surface_len], surface_vertices)
+    p += surface_len
+    cgo[p : p + 4] = (COLOR, 0.1, 0.3, 0.8)
+    cgo[p + 4 : p + 11] = (CYLINDER, *seg_a, *seg_b)
+    cgo[p + 11 : p + 18] = (0.2, 0.1, 0.3, 0.8, 0.1, 0.3, 0.8)
+    return cgo.tolist()
 
 
 def _segment_coords(
     hit,
-    atom_map: Dict[int, Dict[str, Tuple[float, float, float]]],
+    atom_coords: np.ndarray,
 ) -> Optional[Tuple[Tuple[float, float, float], Tuple[float, float, float]]]:
-    a = _atom_coord(hit.res_a, hit.atom_a, atom_map)
-    b = _atom_coord(hit.res_b, hit.atom_b, atom_map)
+    a = _atom_coord(hit.res_a, hit.atom_a, atom_coords)
+    b = _atom_coord(hit.res_b, hit.atom_b, atom_coords)
     if a is None or b is None:
         return None
     return a, b
@@ -502,98 +562,127 @@ def _segment_coords(
 def _atom_coord(
     res_index: int,
     atom_kind,
-    atom_map: Dict[int, Dict[str, Tuple[float, float, float]]],
+    atom_coords: np.ndarray,
 ) -> Optional[Tuple[float, float, float]]:
-    atoms = atom_map.get(res_index, {})
+    if res_index <= 0 or res_index >= len(atom_coords):
+        return None
     if atom_kind == core.AtomKind.P:
-        return atoms.get("P")
-    if atom_kind == core.AtomKind.C4:
-        return atoms.get("C4'")
-    return None
+        xyz = atom_coords[res_index, 0]
+    elif atom_kind == core.AtomKind.C4:
+        xyz = atom_coords[res_index, 1]
+    else:
+        return None
+    if np.isnan(xyz).any():
+        return None
+    x, y, z = xyz.tolist()
+    return x, y, z
+
+
+def _pack_surface(surface) -> SurfaceArrays:
+    # triangles_np views C++ memory owned by `surface`; copy so it can be cached.
+    triangles = np.array(surface.triangles_np, dtype=np.float64)
+    return SurfaceArrays(
+        triangles=triangles,
+        tri_min=triangles.min(axis=1, initial=np.inf),
+        tri_max=triangles.max(axis=1, initial=-np.inf),
+        polygon=_lift_polygon(surface),
+    )
+
+
+def _lift_polygon(surface) -> np.ndarray:
+    verts2d = surface.polygon.vertices_np
+    if not surface.plane.valid or not surface.polygon.valid or not len(verts2d):
+        return np.empty((0, 3), dtype=np.float64)
+    plane = surface.plane
+    basis = np.array(
+        [
+            (plane.e1.x, plane.e1.y, plane.e1.z),
+            (plane.e2.x, plane.e2.y, plane.e2.z),
+        ],
+        dtype=np.float64,
+    )
+    origin = np.array((plane.c.x, plane.c.y, plane.c.z), dtype=np.float64)
+    return verts2d @ basis + origin
 
 
 def _find_hit_triangle(
     a: Tuple[float, float, float],
     b: Tuple[float, float, float],
-    triangles: Iterable[core.Triangle],
+    surface_arrays: SurfaceArrays,
 ) -> Optional[Tuple[Tuple[float, float, float], Tuple[float, float, float], Tuple[float, float, float]]]:
-    for tri in triangles:
-        if _segment_intersects_triangle(a, b, tri):
-            return (
-                (tri.a.x, tri.a.y, tri.a.z),
-                (tri.b.x, tri.b.y, tri.b.z),
-                (tri.c.x, tri.c.y, tri.c.z),
-            )
-    return None
+    # Only triangles whose bounding box overlaps the segment's can be crossed.
+    seg_min = np.minimum(a, b)
+    seg_max = np.maximum(a, b)
+    candidates = np.flatnonzero(
+        np.all(
+            (surface_arrays.tri_min <= seg_max) & (surface_arrays.tri_max >= seg_min),
+            axis=1,
+        )
+    )
+    k = _first_hit_triangle(a, b, surface_arrays.triangles[candidates])
+    if k < 0:
+        return None
+    tri = surface_arrays.triangles[candidates[k]].tolist()
+    return tuple(tri[0]), tuple(tri[1]), tuple(tri[2])
 
 
-def _append_polygon_fan(cgo, surface) -> None:
-    if not surface.plane.valid or not surface.polygon.valid:
-        return
-    vertices = surface.polygon.vertices
-    if vertices is None or len(vertices) < 3:
+def _polygon_fan_vertices(polygon: np.ndarray) -> np.ndarray:
+    """Return (3 * m, 3) vertices of the centroid fan over an m-gon (empty if m < 3)."""
+    if len(polygon) < 3:
+        return np.empty((0, 3), dtype=np.float64)
+    fan = np.empty((len(polygon), 3, 3), dtype=np.float64)
+    fan[:, 0] = polygon.mean(axis=0)
+    fan[:, 1] = polygon
+    fan[:, 2] = np.roll(polygon, -1, axis=0)
+    return fan.reshape(-1, 3)
+
+
+def _triangles_cgo_len(n_vertices: int) -> int:
+    # BEGIN, TRIANGLES, n * (VERTEX, x, y, z), END; nothing at all when empty.
+    return 3 + 4 * n_vertices if n_vertices else 0
+
+
+def _write_triangles_cgo(out: np.ndarray, vertices: np.ndarray) -> None:
+    if not len(vertices):
         return
-    center_x = sum(v.x for v in vertices) / len(vertices)
-    center_y = sum(v.y for v in vertices) / len(vertices)
-    center = _plane_point(surface.plane, center_x, center_y)
-    cgo.extend([BEGIN, TRIANGLES])
-    for i in range(len(vertices)):
-        a2 = vertices[i]
-        b2 = vertices[(i + 1) % len(vertices)]
-        a3 = _plane_point(surface.plane, a2.x, a2.y)
-        b3 = _plane_point(surface.plane, b2.x, b2.y)
-        cgo.extend([VERTEX, center[0], center[1], center[2]])
-        cgo.extend([VERTEX, a3[0], a3[1], a3[2]])
-        cgo.extend([VERTEX, b3[0], b3[1], b3[2]])
-    cgo.extend([END])
-
-
-def _plane_point(plane, x: float, y: float) -> Tuple[float, float, float]:
-    return (
-        plane.c.x + plane.e1.x * x + plane.e2.x * y,
-        plane.c.y + plane.e1.y * x + plane.e2.y * y,
-        plane.c.z + plane.e1.z * x + plane.e2.z * y,
-    )
+    out[0] = BEGIN
+    out[1] = TRIANGLES
+    rows = out[2:-1].reshape(-1, 4)
+    rows[:, 0] = VERTEX
+    rows[:, 1:] = vertices
+    out[-1] = END
 
 
-def _segment_intersects_triangle(
+def _first_hit_triangle(
     a: Tuple[float, float, float],
     b: Tuple[float, float, float],
-    tri: core.Triangle,
+    triangles: np.ndarray,
     eps: float = 1e-8,
-) -> bool:
-    ax, ay, az = a
-    bx, by, bz = b
-    dirx = bx - ax
-    diry = by - ay
-    dirz = bz - az
-    e1x = tri.b.x - tri.a.x
-    e1y = tri.b.y - tri.a.y
-    e1z = tri.b.z - tri.a.z
-    e2x = tri.c.x - tri.a.x
-    e2y = tri.c.y - tri.a.y
-    e2z = tri.c.z - tri.a.z
-    pvecx = diry * e2z - dirz * e2y
-    pvecy = dirz * e2x - dirx * e2z
-    pvecz = dirx * e2y - diry * e2x
-    det = e1x * pvecx + e1y * pvecy + e1z * pvecz
-    if abs(det) < eps:
-        return False
-    inv_det = 1.0 / det
-    tvecx = ax - tri.a.x
-    tvecy = ay - tri.a.y
-    tvecz = az - tri.a.z
-    u = (tvecx * pvecx + tvecy * pvecy + tvecz * pvecz) * inv_det
-    if u < 0.0 or u > 1.0:
-        return False
-    qvecx = tvecy * e1z - tvecz * e1y
-    qvecy = tvecz * e1x - tvecx * e1z
-    qvecz = tvecx * e1y - tvecy * e1x
-    v = (dirx * qvecx + diry * qvecy + dirz * qvecz) * inv_det
-    if v < 0.0 or u + v > 1.0:
-        return False
-    t = (e2x * qvecx + e2y * qvecy + e2z * qvecz) * inv_det
-    return 0.0 < t < 1.0
+) -> int:
+    """Return the index of the first triangle crossed by segment a-b, or -1.
+
+    Moller-Trumbore evaluated for all (n, 3, 3) triangles at once.
+    """
+    if len(triangles) == 0:
+        return -1
+    origin = np.asarray(a, dtype=np.float64)
+    direction = np.asarray(b, dtype=np.float64) - origin
+    v0 = triangles[:, 0]
+    e1 = triangles[:, 1] - v0
+    e2 = triangles[:, 2] - v0
+    pvec = np.cross(direction, e2)
+    det = np.einsum("ij,ij->i", e1, pvec)
+    ok = np.abs(det) >= eps
+    inv_det = np.divide(1.0, det, out=np.zeros_like(det), where=ok)
+    tvec = origin - v0
+    u = np.einsum("ij,ij->i", tvec, pvec) * inv_det
+    qvec = np.cross(tvec, e1)
+    v = (qvec @ direction) * inv_det
+    t = np.einsum("ij,ij->i", e2, qvec) * inv_det
+    ok &= (u >= 0.0) & (u <= 1.0) & (v >= 0.0) & (u + v <= 1.0) & (t > 0.0) & (t < 1.0)
+    hits = np.flatnonzero(ok)
+    return int(hits[0]) if hits.size else -1
 
 
 cmd.extend("rnaknot_hit", rnaknot_hit)
+cmd.extend("rnaknot_clear_cache", rnaknot_clear_cache)
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import argparse
+import os
 import sys
-from typing import Dict, List, Sequence, Tuple
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterator, List, Sequence, TextIO, Tuple
 
+import numpy as np
 
 UNPAIRED_CHARS = {".", "-", "x", "X"}
 OPEN_TO_CLOSE = {
@@ -15,6 +19,50 @@ OPEN_TO_CLOSE = {
 CLOSE_TO_OPEN = {v: k for k, v in OPEN_TO_CLOSE.items()}
 SEQUENCE_CHARS = set("ACGUTNacgutn")
 SECSTRUCT_CHARS = set(OPEN_TO_CLOSE.keys()) | set(CLOSE_TO_OPEN.keys()) | UNPAIRED_CHARS
+# Byte sets for bytes.translate(None, delete): a line belongs to a class when
+# deleting its allowed bytes leaves nothing (non-ASCII bytes never match).
+SEQUENCE_BYTES = "".join(sorted(SEQUENCE_CHARS)).encode("ascii")
+SECSTRUCT_BYTES = "".join(sorted(SECSTRUCT_CHARS)).encode("ascii")
+
+# Byte lookup for parse_secstruct: 0 = unpaired, +k / -k = open / close of
+# the k-th bracket family, UNSUPPORTED_CODE = anything else.
+UNSUPPORTED_CODE = 127
+
+
+def build_bracket_table(
+    open_to_close: Dict[str, str], unpaired_chars: Sequence[str] = ()
+) -> np.ndarray:
+    table = np.full(256, UNSUPPORTED_CODE, dtype=np.int8)
+    for char in unpaired_chars:
+        table[ord(char)] = 0
+    for family, (open_char, close_char) in enumerate(open_to_close.items(), start=1):
+        table[ord(open_char)] = family
+        table[ord(close_char)] = -family
+    return table
+
+
+def bracket_codes(text: str, table: np.ndarray) -> np.ndarray:
+    points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    return table[np.minimum(points, 255)]
+
+
+def pair_brackets(steps: np.ndarray) -> np.ndarray:
+    """Match balanced +1 (open) / -1 (close) steps of one bracket family.
+
+    Returns an (n, 2) array of 0-based (open, close) positions sorted by close.
+    Opens and closes at the same nesting depth alternate along the string, so
+    sorting them by (depth, position) lines each open up with its partner.
+    """
+    depth = np.cumsum(steps)
+    opens = np.flatnonzero(steps > 0)
+    closes = np.flatnonzero(steps < 0)
+    positions = np.concatenate((opens, closes))
+    levels = np.concatenate((depth[opens], depth[closes] + 1))
+    pairs = positions[np.lexsort((positions, levels))].reshape(-1, 2)
+    return pairs[np.argsort(pairs[:, 1], kind="stable")]
+
+
+SECSTRUCT_TABLE = build_bracket_table(OPEN_TO_CLOSE, sorted(UNPAIRED_CHARS))
 
 
 def main() -> int:
@@ -32,17 +80,25 @@ def main() -> int:
 
     sequence, secstruct = read_secstruct_file(args.secstruct_path)
     pair_map = parse_secstruct(secstruct)
-    lines = format_bpseq(sequence, pair_map)
 
     if args.output == "-":
-        sys.stdout.write("".join(lines))
+        write_bpseq(sys.stdout, sequence, pair_map)
     else:
         with open(args.output, "w", encoding="utf-8") as handle:
-            handle.write("".join(lines))
+            write_bpseq(handle, sequence, pair_map)
     return 0
 
 
 def read_secstruct_file(path: str) -> Tuple[str, str]:
+    # Memoized per file version: repeated runs on one file skip the re-read.
+    stat = os.stat(path)
+    return _read_secstruct_file_cached(
+        os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+    )
+
+
+@lru_cache(maxsize=16)
+def _read_secstruct_file_cached(path: str, mtime_ns: int, size: int) -> Tuple[str, str]:
     raw_lines = _load_lines(path)
     seq_parts: List[str] = []
     ss_parts: List[str] = []
@@ -85,49 +141,103 @@ def _load_lines(path: str) -> List[str]:
 
 
 def _looks_like_sequence(line: str) -> bool:
-    return all(char in SEQUENCE_CHARS for char in line)
+    return not line.encode("utf-8").translate(None, SEQUENCE_BYTES)
 
 
 def _looks_like_secstruct(line: str) -> bool:
-    return all(char in SECSTRUCT_CHARS for char in line)
+    return not line.encode("utf-8").translate(None, SECSTRUCT_BYTES)
 
 
 def parse_secstruct(secstruct: str) -> List[int]:
-    pair_map: List[int] = [0] * (len(secstruct) + 1)
-    stacks: Dict[str, List[int]] = {ch: [] for ch in OPEN_TO_CLOSE}
-
-    for idx, char in enumerate(secstruct, start=1):
-        if char in OPEN_TO_CLOSE:
-            stacks[char].append(idx)
-            continue
-        if char in CLOSE_TO_OPEN:
-            open_char = CLOSE_TO_OPEN[char]
-            if not stacks[open_char]:
-                raise ValueError(f"Unbalanced secstruct: unexpected {char} at {idx}")
-            i = stacks[open_char].pop()
-            pair_map[i] = idx
-            pair_map[idx] = i
-            continue
-        if char in UNPAIRED_CHARS:
-            continue
-        raise ValueError(f"Unsupported secstruct symbol: {char}")
-
-    for open_char, stack in stacks.items():
-        if stack:
-            raise ValueError(
-                f"Unbalanced secstruct: missing {OPEN_TO_CLOSE[open_char]}"
-            )
-
-    return pair_map
+    pairs = _secstruct_pair_array(secstruct)
+    pair_map = np.zeros(len(secstruct) + 1, dtype=np.int64)
+    pair_map[pairs[:, 0]] = pairs[:, 1]
+    pair_map[pairs[:, 1]] = pairs[:, 0]
+    return pair_map.tolist()
+
+
+def parse_secstruct_pairs(secstruct: str) -> List[Tuple[int, int]]:
+    # 1-based (i, j) pairs with i < j, ordered by i, without the pair_map.
+    return list(map(tuple, _secstruct_pair_array(secstruct).tolist()))
+
+
+@lru_cache(maxsize=16)
+def _secstruct_pair_array(secstruct: str) -> np.ndarray:
+    # Cached on the string and shared between callers, hence read-only.
+    codes = bracket_codes(secstruct, SECSTRUCT_TABLE)
+
+    # Report whichever error a left-to-right scan would have hit first.
+    error = ""
+    error_pos = len(secstruct)
+    unsupported = np.flatnonzero(codes == UNSUPPORTED_CODE)
+    if unsupported.size:
+        error_pos = int(unsupported[0])
+        error = f"Unsupported secstruct symbol: {secstruct[error_pos]}"
+    missing: List[str] = []
+    family_steps: List[np.ndarray] = []
+
+    for family, close_char in enumerate(OPEN_TO_CLOSE.values(), start=1):
+        steps = (codes == family).astype(np.int64) - (codes == -family)
+        depth = np.cumsum(steps)
+        unexpected = np.flatnonzero(depth < 0)
+        if unexpected.size and unexpected[0] < error_pos:
+            error_pos = int(unexpected[0])
+            error = f"Unbalanced secstruct: unexpected {close_char} at {error_pos + 1}"
+        if depth.size and depth[-1] > 0:
+            missing.append(close_char)
+        family_steps.append(steps)
+
+    if error:
+        raise ValueError(error)
+    if missing:
+        raise ValueError(f"Unbalanced secstruct: missing {missing[0]}")
+
+    pairs = np.concatenate([pair_brackets(steps) for steps in family_steps]) + 1
+    pairs = pairs[np.argsort(pairs[:, 0], kind="stable")]
+    pairs.setflags(write=False)
+    return pairs
+
+
+BPSEQ_CHUNK_LINES = 65536
+
+
+def _bpseq_rows(
+    sequence: str, pair_map: Sequence[int]
+) -> Iterator[Tuple[int, str, int]]:
+    if len(sequence) != len(pair_map) - 1:
+        raise ValueError(
+            f"Sequence length ({len(sequence)}) does not match pair map length "
+            f"({len(pair_map) - 1})."
+        )
+    partners = iter(pair_map)
+    next(partners, None)  # pair_map[0] is the unused 1-based padding slot
+    return zip(range(1, len(pair_map)), sequence, partners)
 
 
 def format_bpseq(sequence: str, pair_map: Sequence[int]) -> List[str]:
-    lines: List[str] = []
-    for idx in range(1, len(pair_map)):
-        base = sequence[idx - 1]
-        partner = pair_map[idx]
-        lines.append(f"{idx} {base} {partner}\n")
-    return lines
+    rows = _bpseq_rows(sequence, pair_map)
+    return [f"{idx} {base} {partner}\n" for idx, base, partner in rows]
+
+
+def write_bpseq(
+    handle: TextIO,
+    sequence: str,
+    pair_map: Sequence[int],
+    chunk_lines: int = BPSEQ_CHUNK_LINES,
+) -> None:
+    # Join and write fixed-size chunks so peak memory stays bounded and no
+    # full-length line list is built for long sequences.
+    rows = _bpseq_rows(sequence, pair_map)
+    while True:
+        chunk = "".join(
+            [
+                f"{idx} {base} {partner}\n"
+                for idx, base, partner in islice(rows, chunk_lines)
+            ]
+        )
+        if not chunk:
+            break
+        handle.write(chunk)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,238 @@
+"""Check the fast/fused/parallel paths against the baseline paths on the examples."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import rnaknotdetector_core as core
+
+from _pymol_common import endpoint_label_table
+from input_layer import load_coord_arrays, load_coords, load_coords_np
+from secstruct2bpseq import parse_secstruct, read_secstruct_file
+from test_entanglement_example import _format_hit_lines, _loop_prefix, _pair_map_to_list
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+STRUCTURES = [
+    ("Example01.pdb", None),
+    ("Example02.pdb", None),
+    ("EntangledTwoHairpins.pdb", None),
+    ("SimpleHairpin.pdb", None),
+    ("6t3r.cif", "A"),
+]
+ATOM_NAMES = ("P", "C4'")
+POLYLINE_MODES = (0, 1)
+
+
+@lru_cache(maxsize=None)
+def _example(name, chain):
+    """(CoordArrays, ResidueCoordArray, loops) as the example CLI builds them."""
+    arrays = load_coord_arrays(
+        str(EXAMPLES / name),
+        atom_names=ATOM_NAMES,
+        chain_id=chain,
+        missing_policy="nan",
+        use_cache=False,
+    )
+    coords = core.residue_coords_from_numpy(arrays.res_index, arrays.atoms)
+    _, secstruct = read_secstruct_file(str(EXAMPLES / f"{Path(name).stem}.secstruct"))
+    pair_map = parse_secstruct(secstruct)
+    loops = core.build_loops(
+        _pair_map_to_list(pair_map), len(pair_map) - 1, main_layer_only=False
+    )
+    return arrays, coords, loops
+
+
+def _baseline(coords, loops, polyline_mode):
+    # Separate build + evaluate, serial, FP64, no fast reject.
+    surfaces = core.build_surfaces(coords, loops, num_threads=1)
+    return core.evaluate_entanglement(
+        coords, surfaces, polyline_mode=polyline_mode, num_threads=1
+    )
+
+
+def _hit_keys(result):
+    return [
+        (hit.loop_id, hit.segment_id, hit.res_a, hit.res_b)
+        + (int(hit.atom_a), int(hit.atom_b))
+        for hit in result.hits
+    ]
+
+
+def _hit_points(result):
+    return np.array([(hit.point.x, hit.point.y, hit.point.z) for hit in result.hits])
+
+
+def _coord_rows(coords):
+    res_ids = [res.pdb_res_id for res in coords]
+    atoms = np.array([res.atoms for res in coords], dtype=np.float64)
+    return res_ids, atoms
+
+
+@pytest.mark.parametrize("name, chain", STRUCTURES)
+def test_load_coords_np_matches_biopython(name, chain):
+    path = str(EXAMPLES / name)
+    options = dict(atom_names=ATOM_NAMES, chain_id=chain, missing_policy="nan")
+    expected = _coord_rows(load_coords(path, use_cache=False, **options))
+    actual = _coord_rows(load_coords_np(path, **options))
+    assert actual[0] == expected[0]
+    np.testing.assert_allclose(actual[1], expected[1], equal_nan=True)
+
+
+def test_load_coords_np_quoted_first_atom_site_row(tmp_path):
+    # Drop the leading atom rows so the first _atom_site row carries "C4'".
+    lines = (EXAMPLES / "6t3r.cif").read_text().splitlines(keepends=True)
+    header = [idx for idx, line in enumerate(lines) if line.startswith("_atom_site.")]
+    first_row = header[-1] + 1
+    c4_row = next(idx for idx in range(first_row, len(lines)) if '"C4\'"' in lines[idx])
+    path = tmp_path / "c4_first.cif"
+    path.write_text("".join(lines[:first_row] + lines[c4_row:]))
+
+    expected = load_coords(str(path), chain_id="A", use_cache=False)
+    actual = load_coords_np(str(path), chain_id="A")
+    assert [res.pdb_res_id for res in actual] == [res.pdb_res_id for res in expected]
+    np.testing.assert_allclose(_coord_rows(actual)[1], _coord_rows(expected)[1])
+
+
+@pytest.mark.parametrize("polyline_mode", POLYLINE_MODES)
+@pytest.mark.parametrize("name, chain", STRUCTURES)
+def test_hits_array_matches_hits(name, chain, polyline_mode):
+    _, coords, loops = _example(name, chain)
+    result = _baseline(coords, loops, polyline_mode)
+    hits = result.hits_array
+    assert hits.dtype.names == (
+        "loop_id", "segment_id", "res_a", "res_b", "atom_a", "atom_b", "x", "y", "z"
+    )
+    assert [row[:6] for row in hits.tolist()] == _hit_keys(result)
+    points = np.column_stack([hits["x"], hits["y"], hits["z"]])
+    np.testing.assert_array_equal(points, _hit_points(result).reshape(-1, 3))
+
+
+@pytest.mark.parametrize("polyline_mode", POLYLINE_MODES)
+@pytest.mark.parametrize("name, chain", STRUCTURES)
+def test_format_hit_lines_matches_per_hit_lookup(name, chain, polyline_mode):
+    arrays, coords, loops = _example(name, chain)
+    result = _baseline(coords, loops, polyline_mode)
+    res_ids = dict(zip(arrays.res_index.tolist(), arrays.pdb_res_ids))
+    atom_labels = {core.AtomKind.P: "P", core.AtomKind.C4: "C4'"}
+
+    def endpoint(res_index, atom_kind):
+        label = res_ids.get(res_index, str(res_index))
+        return f"{label}:{atom_labels.get(atom_kind, 'X')}"
+
+    loop_map = {loop.id: loop for loop in loops}
+    expected = []
+    for hit in result.hits:
+        i_label = endpoint(hit.res_a, hit.atom_a)
+        j_label = endpoint(hit.res_b, hit.atom_b)
+        p = hit.point
+        expected.append(
+            f"{_loop_prefix(loop_map[hit.loop_id])} segment=({i_label},{j_label}) "
+            f"point=({p.x:.3f},{p.y:.3f},{p.z:.3f})\n"
+        )
+    label_table = endpoint_label_table(res_ids)
+    assert _format_hit_lines(result.hits_array, loops, label_table) == expected
+
+
+@pytest.mark.parametrize("name, chain", STRUCTURES)
+def test_surface_array_valid_count(name, chain):
+    _, coords, loops = _example(name, chain)
+    surfaces = core.build_surfaces(coords, loops)
+    assert isinstance(surfaces, core.SurfaceArray)
+    expected = sum(1 for s in surfaces if s.plane.valid and s.polygon.valid)
+    assert surfaces.valid_count == expected
+
+
+@pytest.mark.parametrize("polyline_mode", POLYLINE_MODES)
+@pytest.mark.parametrize("name, chain", STRUCTURES)
+def test_opaque_arrays_match_python_lists(name, chain, polyline_mode):
+    arrays, coords, loops = _example(name, chain)
+    coords_list = [
+        core.ResidueCoord(res_index, [core.Vec3(*xyz) for xyz in atoms])
+        for res_index, atoms in zip(arrays.res_index.tolist(), arrays.atoms.tolist())
+    ]
+    expected = _baseline(coords, loops, polyline_mode)
+    surfaces = list(core.build_surfaces(coords_list, loops, num_threads=1))
+    result = core.evaluate_entanglement(
+        coords_list, surfaces, polyline_mode=polyline_mode, num_threads=1
+    )
+    assert _hit_keys(result) == _hit_keys(expected)
+    np.testing.assert_array_equal(_hit_points(result), _hit_points(expected))
+
+
+@pytest.mark.parametrize("name, chain", STRUCTURES)
+def test_parallel_build_surfaces_matches_serial(name, chain):
+    _, coords, loops = _example(name, chain)
+    serial = core.build_surfaces(coords, loops, num_threads=1)
+    parallel = core.build_surfaces(coords, loops, num_threads=4)
+    assert [s.loop_id for s in parallel] == [s.loop_id for s in serial]
+    for got, want in zip(parallel, serial):
+        assert got.plane.valid == want.plane.valid
+        assert got.polygon.valid == want.polygon.valid
+        np.testing.assert_array_equal(got.triangles_np, want.triangles_np)
+
+
+@pytest.mark.parametrize("polyline_mode", POLYLINE_MODES)
+@pytest.mark.parametrize("name, chain", STRUCTURES)
+def test_parallel_fast_reject_matches_serial(name, chain, polyline_mode):
+    _, coords, loops = _example(name, chain)
+    expected = _baseline(coords, loops, polyline_mode)
+    arena = core.ScratchArena()
+    for _ in range(2):  # a reused arena must not change the result
+        surfaces = core.build_surfaces(coords, loops, num_threads=4, arena=arena)
+        result = core.evaluate_entanglement(
+            coords,
+            surfaces,
+            polyline_mode=polyline_mode,
+            fast_reject=True,
+            num_threads=4,
+            arena=arena,
+        )
+        assert _hit_keys(result) == _hit_keys(expected)
+        np.testing.assert_array_equal(_hit_points(result), _hit_points(expected))
+
+
+# 6t3r is left out: fp32 flips near-edge hits there (see --precision).
+@pytest.mark.parametrize("polyline_mode", POLYLINE_MODES)
+@pytest.mark.parametrize("name, chain", STRUCTURES[:-1])
+def test_fp32_matches_fp64(name, chain, polyline_mode):
+    _, coords, loops = _example(name, chain)
+    expected = _baseline(coords, loops, polyline_mode)
+    surfaces = core.build_surfaces(coords, loops)
+    for precision in (core.Precision.FP64, core.Precision.FP32):
+        result = core.evaluate_entanglement(
+            coords, surfaces, polyline_mode=polyline_mode, precision=int(precision)
+        )
+        assert _hit_keys(result) == _hit_keys(expected)
+        np.testing.assert_allclose(
+            _hit_points(result), _hit_points(expected), rtol=0, atol=1e-4
+        )
+
+
+@pytest.mark.parametrize("polyline_mode", POLYLINE_MODES)
+@pytest.mark.parametrize("name, chain", STRUCTURES)
+def test_detect_entanglement_matches_build_and_evaluate(name, chain, polyline_mode):
+    _, coords, loops = _example(name, chain)
+    surfaces = core.build_surfaces(coords, loops, num_threads=1)
+    expected = _baseline(coords, loops, polyline_mode)
+    result = core.detect_entanglement(coords, loops, polyline_mode=polyline_mode)
+    assert _hit_keys(result) == _hit_keys(expected)
+    np.testing.assert_array_equal(_hit_points(result), _hit_points(expected))
+    assert result.n_surfaces == len(surfaces)
+    assert result.n_valid_surfaces == surfaces.valid_count
+
+
+def test_detect_entanglement_counts_surfaces_without_segments():
+    # Every other P missing: no P-P segment, but loops still get surfaces.
+    arrays, _, loops = _example("Example02.pdb", None)
+    atoms = arrays.atoms.copy()
+    atoms[1::2, 0, :] = np.nan
+    coords = core.residue_coords_from_numpy(arrays.res_index, atoms)
+    surfaces = core.build_surfaces(coords, loops)
+    result = core.detect_entanglement(coords, loops, polyline_mode=0)
+    assert result.K == 0
+    assert result.n_surfaces == len(surfaces) > 0
+    assert result.n_valid_surfaces == surfaces.valid_count
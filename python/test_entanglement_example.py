@@ -1,47 +1,72 @@
 from __future__ import annotations
 
 import argparse
-from typing import Iterable, List, Tuple
+import logging
+import sys
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
 
 import rnaknotdetector_core as core
 
-from input_layer import ResidueCoord as PyResidueCoord
-from input_layer import load_coords
+from _pymol_common import ATOM_LABEL, endpoint_label_table
+from input_layer import load_coord_arrays
 from secstruct2bpseq import parse_secstruct, read_secstruct_file
 
-
-def _to_cpp_coords(py_coords: Iterable[PyResidueCoord]) -> List[core.ResidueCoord]:
-    coords: List[core.ResidueCoord] = []
-    for res in py_coords:
-        atoms = [core.Vec3(*atom) for atom in res.atoms]
-        coords.append(core.ResidueCoord(res.res_index, atoms))
-    return coords
-
-
-def _pair_map_to_list(pair_map: List[int]) -> List[Tuple[int, int]]:
-    pairs: List[Tuple[int, int]] = []
-    for i in range(1, len(pair_map)):
-        j = pair_map[i]
-        if j > i:
-            pairs.append((i, j))
-    return pairs
-
-
-def _atom_kind_label(kind) -> str:
-    if kind == core.AtomKind.P:
-        return "P"
-    if kind == core.AtomKind.C4:
-        return "C4'"
-    return "X"
-
-
-def _format_endpoint(res_id_map, res_index: int, atom_kind) -> str:
-    label = res_id_map.get(res_index, str(res_index))
-    atom_label = _atom_kind_label(atom_kind)
-    return f"{label}:{atom_label}"
+logger = logging.getLogger(__name__)
+
+
+def _pair_map_to_list(pair_map: Sequence[int]) -> List[Tuple[int, int]]:
+    # Each pair once from its opening side (pair_map[i] = j > i); index 0 is unused.
+    partners = np.asarray(pair_map, dtype=np.int64)
+    opens = np.flatnonzero(partners > np.arange(len(partners)))
+    opens = opens[opens > 0]
+    return list(zip(opens.tolist(), partners[opens].tolist()))
+
+
+_PRECISION = {"fp32": int(core.Precision.FP32), "fp64": int(core.Precision.FP64)}
+
+
+def _loop_prefix(loop: core.Loop) -> str:
+    loop_type = str(loop.kind)
+    if loop.kind == core.LoopKind.INTERNAL and not loop.boundary_residues:
+        loop_type = "LoopKind.STACKING"
+    closing_pairs = [(bp.i, bp.j) for bp in loop.closing_pairs]
+    return f"hit loop={loop.id} type={loop_type} pairs={closing_pairs}"
+
+
+def _format_hit_lines(
+    hits: np.ndarray,
+    loops: Sequence[core.Loop],
+    label_table: List[str],
+) -> List[str]:
+    """Format Result.hits_array rows; columns are pulled out once as plain lists."""
+    # The loop part of a line is shared by every hit on that loop; format it
+    # once into a list indexed by the (dense, 1-based) loop id.
+    n_slots = max((loop.id for loop in loops), default=0) + 1
+    prefixes: List[Optional[str]] = [None] * n_slots
+    for loop in loops:
+        prefixes[loop.id] = _loop_prefix(loop)
+    n_kinds = len(ATOM_LABEL)
+    slots_a = (hits["res_a"].astype(np.int64) * n_kinds + hits["atom_a"]).tolist()
+    slots_b = (hits["res_b"].astype(np.int64) * n_kinds + hits["atom_b"]).tolist()
+    columns = (hits[name].tolist() for name in ("loop_id", "x", "y", "z"))
+    lines: List[str] = []
+    for slot_a, slot_b, (loop_id, x, y, z) in zip(slots_a, slots_b, zip(*columns)):
+        prefix = prefixes[loop_id] if 0 <= loop_id < len(prefixes) else None
+        if prefix is None:
+            continue
+        i_label = label_table[slot_a]
+        j_label = label_table[slot_b]
+        lines.append(
+            f"{prefix} segment=({i_label},{j_label}) point=({x:.3f},{y:.3f},{z:.3f})\n"
+        )
+    return lines
 
 
-def main() -> int:
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Evaluate entanglement on an example PDB + secstruct."
     )
@@ -74,69 +99,129 @@ def main() -> int:
         action="store_true",
         help="Build loops from main layer pairs only (default).",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--fast-reject",
+        action="store_true",
+        help="Pre-reject segment/triangle pairs with diagonal-plane sign codes.",
+    )
+    parser.add_argument(
+        "--precision",
+        choices=("fp32", "fp64"),
+        default="fp64",
+        help="Segment/triangle test precision (fp32: faster, may flip edge hits).",
+    )
+    parser.add_argument(
+        "--num-threads",
+        type=int,
+        default=0,
+        help="Worker threads for surface building/evaluation (0=all cores).",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print [debug] progress lines (bp/loop counts) to stdout.",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Print K only; skip the per-hit lines.",
+    )
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    _evaluate(args)
+    return 0
 
-    coords_py = load_coords(
+
+def _configure_logger(verbose: bool) -> None:
+    # Per run, so a verbose call does not leak into later ones; the handler
+    # goes on this module's logger and leaves the root logger alone.
+    if verbose and not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("[debug] %(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG if verbose else logging.WARNING)
+
+
+def run_many(
+    pdb_paths: Sequence[str], secstruct_paths: Sequence[str], **options
+) -> List[int]:
+    """Evaluate each (pdb, secstruct) pair in-process and return the K values.
+
+    options use the argparse dest names, e.g. chain="A", surface_mode=0, quiet=True.
+    """
+    if len(pdb_paths) != len(secstruct_paths):
+        raise ValueError("pdb_paths and secstruct_paths must have the same length")
+    defaults = vars(_build_parser().parse_args(["", ""]))
+    unknown = sorted(set(options) - set(defaults))
+    if unknown:
+        raise TypeError(f"Unknown option(s): {', '.join(unknown)}")
+    base = {**defaults, **options}
+    arena = core.ScratchArena()
+    results: List[int] = []
+    for pdb_path, ss_path in zip(pdb_paths, secstruct_paths):
+        base.update(pdb_path=pdb_path, secstruct_path=ss_path)
+        results.append(_evaluate(argparse.Namespace(**base), arena))
+    return results
+
+
+def _evaluate(
+    args: argparse.Namespace, arena: Optional[core.ScratchArena] = None
+) -> int:
+    _configure_logger(args.verbose)
+    coord_arrays = load_coord_arrays(
         args.pdb_path,
         atom_names=("P", "C4'"),
         chain_id=args.chain,
         missing_policy="nan",
     )
-    coords_cpp = _to_cpp_coords(coords_py)
+    coords_cpp = core.residue_coords_from_numpy(
+        coord_arrays.res_index, coord_arrays.atoms
+    )
 
     _, secstruct = read_secstruct_file(args.secstruct_path)
     pair_map = parse_secstruct(secstruct)
     bp_list = _pair_map_to_list(pair_map)
-    print(f"[debug] input bp count = {len(bp_list)}")
+    logger.debug("input bp count = %d", len(bp_list))
 
     if args.main_layer_only or not bp_list:
         main_pairs = core.get_main_layer_pairs(bp_list)
-        print(f"[debug] main layer bp count = {len(main_pairs)}")
+        logger.debug("main layer bp count = %d", len(main_pairs))
         loop_pairs = main_pairs
     else:
         loop_pairs = bp_list
     loops = core.build_loops(loop_pairs, len(pair_map) - 1, main_layer_only=False)
-    print(f"[debug] loops built = {len(loops)}")
-    surfaces = core.build_surfaces(
+    logger.debug("loops built = %d", len(loops))
+    result = core.detect_entanglement(
         coords_cpp,
         loops,
         eps_collinear=args.eps_collinear,
         surface_mode=args.surface_mode,
         multi_chunk=args.multi_chunk,
-    )
-    valid_surfaces = sum(1 for s in surfaces if s.plane.valid and s.polygon.valid)
-    print(f"[debug] surfaces built = {len(surfaces)} valid = {valid_surfaces}")
-    result = core.evaluate_entanglement(
-        coords_cpp,
-        surfaces,
         polyline_mode=args.polyline_mode,
         eps_plane=args.eps_plane,
         eps_polygon=args.eps_polygon,
+        fast_reject=args.fast_reject,
+        precision=_PRECISION[args.precision],
+        num_threads=args.num_threads,
+        arena=arena,
+    )
+    logger.debug(
+        "surfaces built = %d valid = %d", result.n_surfaces, result.n_valid_surfaces
     )
 
-    print("[debug] indices are 1-based (residue indices and segment ids)")
+    logger.debug("indices are 1-based (residue indices and segment ids)")
     print(f"K = {result.K}")
-    loop_map = {loop.id: loop for loop in loops}
-    res_id_map = {res.res_index: res.pdb_res_id for res in coords_py}
-    for hit in result.hits:
-        loop = loop_map.get(hit.loop_id)
-        if loop is None:
-            continue
-        p = hit.point
-        loop_type = str(loop.kind)
-        if loop.kind == core.LoopKind.INTERNAL and not loop.boundary_residues:
-            loop_type = "LoopKind.STACKING"
-        closing_pairs = [(bp.i, bp.j) for bp in loop.closing_pairs]
-        i = hit.res_a
-        j = hit.res_b
-        i_label = _format_endpoint(res_id_map, i, hit.atom_a)
-        j_label = _format_endpoint(res_id_map, j, hit.atom_b)
-        print(
-            f"hit loop={hit.loop_id} type={loop_type} "
-            f"pairs={closing_pairs} segment=({i_label},{j_label}) "
-            f"point=({p.x:.3f},{p.y:.3f},{p.z:.3f})"
-        )
-    return 0
+    if args.quiet:
+        return result.K
+    label_table = endpoint_label_table(
+        dict(zip(coord_arrays.res_index.tolist(), coord_arrays.pdb_res_ids))
+    )
+    hit_lines = _format_hit_lines(result.hits_array, loops, label_table)
+    sys.stdout.write("".join(hit_lines))
+    return result.K
 
 
 if __name__ == "__main__":